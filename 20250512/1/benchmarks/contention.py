@@ -0,0 +1,82 @@
+"""Contention benchmark of the MOOD game state.
+
+Several threads play as separate clients and run the same random mix of
+move, addmon and attack commands, once against a Game owned by a
+single-writer GameActor and once against a StripedGame called directly from
+every thread. On a free-threaded (no-GIL) CPython build the striped game can
+use several cores; with the GIL both variants are limited to one.
+
+Usage::
+
+    python -m benchmarks.contention --threads 8 --ops 20000
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from mood.server.actor import GameActor, InlineActor
+from mood.server.outbox import NullOutbox
+from mood.server.server import Game, StripedGame, dispatch
+
+
+def play(actor, user, ops, width, seed):
+    """Run a random mix of commands as one client."""
+    rng = random.Random(seed)
+    for _ in range(ops):
+        r = rng.random()
+        if r < 0.5:
+            cmd = {"type": "move", "dx": rng.choice((-1, 1)), "dy": 0}
+        elif r < 0.8:
+            cmd = {"type": "addmon", "x": rng.randrange(width),
+                   "y": rng.randrange(width), "name": "tux",
+                   "hello": "Hi", "hp": 10}
+        else:
+            cmd = {"type": "attack", "name": "tux", "damage": 1}
+        actor.call(dispatch, actor.game, user, cmd)
+
+
+def run(game_class, actor_class, threads, ops, width):
+    """Run every client in its own thread and return the elapsed time."""
+    game = game_class(width=width, height=width)
+    actor = actor_class(game)
+    actor.start_thread()
+    for i in range(threads):
+        game.add_player(f"p{i}", NullOutbox())
+        game.get_player(f"p{i}").move(i * width // threads, 0)
+    workers = [threading.Thread(target=play,
+                                args=(actor, f"p{i}", ops, width, i))
+               for i in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    actor.stop()
+    return elapsed
+
+
+def main():
+    """Run the benchmark and print the throughput of both variants."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=20000,
+                        help="Commands per thread")
+    parser.add_argument("--width", type=int, default=1000,
+                        help="World width and height in cells")
+    args = parser.parse_args()
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'on' if gil else 'off'}, "
+          f"{args.threads} threads x {args.ops} commands")
+    total = args.threads * args.ops
+    for label, game_class, actor_class in (("actor", Game, GameActor),
+                                           ("striped", StripedGame, InlineActor)):
+        elapsed = run(game_class, actor_class, args.threads, args.ops,
+                      args.width)
+        print(f"{label:8} {elapsed:8.3f} s {total / elapsed:12.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
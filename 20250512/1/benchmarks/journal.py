@@ -0,0 +1,71 @@
+"""Throughput benchmark of the MOOD command journal.
+
+Appends move commands at a fixed rate, committing once per tick as the
+server does, and reports the achieved rate and the number of fsyncs. For
+comparison it also measures how many commands per second an fsync per
+command would allow on the same disk.
+
+Usage::
+
+    python -m benchmarks.journal --rate 10000 --seconds 5 --dir /tmp
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from mood.server.journal import Journal
+
+
+def group_commit(path, rate, seconds, tick):
+    """Append rate commands per second with one commit per tick."""
+    journal = Journal(path)
+    per_tick = max(1, int(rate * tick))
+    started = time.perf_counter()
+    deadline = started
+    while deadline - started < seconds:
+        for i in range(per_tick):
+            journal.append("bench", {"type": "move", "dx": 1, "dy": 0})
+        journal.commit()
+        deadline += tick
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    journal.close()
+    elapsed = time.perf_counter() - started
+    return journal.seq / elapsed, journal.commits
+
+
+def fsync_each(path, count):
+    """Append count commands with an fsync after every one."""
+    journal = Journal(path)
+    started = time.perf_counter()
+    for _ in range(count):
+        journal.append("bench", {"type": "move", "dx": 1, "dy": 0})
+        journal.sync()
+    elapsed = time.perf_counter() - started
+    journal.close()
+    return count / elapsed
+
+
+def main():
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=int, default=10000,
+                        help="Commands per second to append")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--tick", type=float, default=0.05)
+    parser.add_argument("--dir", default=None,
+                        help="Directory for the journal (default: a temporary one)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        rate, commits = group_commit(os.path.join(directory, "group"),
+                                     args.rate, args.seconds, args.tick)
+        print(f"group commit: {rate:10.0f} commands/s, {commits} fsyncs "
+              f"in {args.seconds:g} s")
+        single = fsync_each(os.path.join(directory, "single"), 1000)
+        print(f"fsync each:   {single:10.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import pytest
+
+from mood.server.outbox import Outbox
+
+
+class RecordingOutbox(Outbox):
+    """Очередь без писателя: кадры остаются в очереди."""
+
+    def _wakeup(self):
+        pass
+
+
+@pytest.fixture
+def recording_outbox():
+    """Фабрика очередей, кадры из которых читаются через _take_all()."""
+    return RecordingOutbox
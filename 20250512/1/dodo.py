@@ -51,14 +51,60 @@ def task_test():
     return {
         'actions': [
             'pipenv run pytest test_server_commands.py -v',
-            'pipenv run pytest test_client_commands.py -v'
+            'pipenv run pytest test_client_commands.py -v',
+            'pipenv run pytest test_framing.py -v',
+            'pipenv run pytest test_outbox.py -v',
+            'pipenv run pytest test_world.py -v',
+            'pipenv run pytest test_scheduler.py -v',
+            'pipenv run pytest test_simulation.py -v',
+            'pipenv run pytest test_actor.py -v',
+            'pipenv run pytest test_snapshot.py -v',
+            'pipenv run pytest test_journal.py -v',
+            'pipenv run pytest test_playback.py -v',
+            'pipenv run pytest test_bench.py -v',
+            'pipenv run pytest test_metrics.py -v',
+            'pipenv run pytest test_logs.py -v',
+            'pipenv run pytest test_locales.py -v',
+            'pipenv run pytest test_ratelimit.py -v'
         ],
         'file_dep': [
             'test_server_commands.py',
             'test_client_commands.py',
+            'test_framing.py',
+            'test_outbox.py',
+            'test_world.py',
+            'test_scheduler.py',
+            'test_simulation.py',
+            'test_actor.py',
+            'test_snapshot.py',
+            'test_journal.py',
+            'test_playback.py',
+            'test_bench.py',
+            'test_metrics.py',
+            'test_logs.py',
+            'test_locales.py',
+            'test_ratelimit.py',
+            'conftest.py',
             'mood/server/server.py',
             'mood/client/client.py',
-            'mood/common/models.py'
+            'mood/common/models.py',
+            'mood/common/framing.py',
+            'mood/server/outbox.py',
+            'mood/server/aoi.py',
+            'mood/server/world.py',
+            'mood/server/scheduler.py',
+            'mood/server/simulation.py',
+            'mood/server/actor.py',
+            'mood/server/snapshot.py',
+            'mood/server/journal.py',
+            'mood/server/recorder.py',
+            'mood/server/playback.py',
+            'mood/client/bench.py',
+            'mood/client/render.py',
+            'mood/server/metrics.py',
+            'mood/server/logs.py',
+            'mood/server/locales.py',
+            'mood/server/ratelimit.py'
         ],
         'task_dep': ['compile'],
         'clean': [clean_targets],
@@ -73,10 +119,28 @@ def task_wheel():
             'mood/client/client.py',
             'mood/client/__init__.py',
             'mood/client/__main__.py',
+            'mood/client/bench.py',
+            'mood/client/render.py',
             'mood/server/server.py',
             'mood/server/__init__.py',
             'mood/server/__main__.py',
+            'mood/server/events.py',
+            'mood/server/outbox.py',
+            'mood/server/aoi.py',
+            'mood/server/world.py',
+            'mood/server/scheduler.py',
+            'mood/server/simulation.py',
+            'mood/server/actor.py',
+            'mood/server/snapshot.py',
+            'mood/server/journal.py',
+            'mood/server/recorder.py',
+            'mood/server/playback.py',
+            'mood/server/metrics.py',
+            'mood/server/logs.py',
+            'mood/server/locales.py',
+            'mood/server/ratelimit.py',
             'mood/common/models.py',
+            'mood/common/framing.py',
             'mood/common/__init__.py',
             'mood/server/locale/ru_RU/LC_MESSAGES/messages.mo'
         ],
@@ -4,6 +4,7 @@ import argparse
 import os
 
 from .client import MudCmd
+from .render import REDRAW_RATE
 
 
 def main():
@@ -18,12 +19,22 @@ def main():
     parser = argparse.ArgumentParser(description="MOOD game client")
     parser.add_argument("username", help="Player's username")
     parser.add_argument("--file", help="Path to .mood script file to execute")
+    parser.add_argument("--no-throttle", dest="throttle", action="store_false",
+                        help="Send commands without waiting a second between "
+                             "them; the server paces them instead")
+    parser.add_argument("--redraw-rate", type=float, default=REDRAW_RATE,
+                        help="Maximum number of screen updates per second "
+                             f"(default: {REDRAW_RATE:g})")
     args = parser.parse_args()
 
     if " " in args.username:
         print("Error: Username cannot contain spaces")
         sys.exit(1)
 
+    if args.redraw_rate <= 0:
+        print("Error: Redraw rate must be positive")
+        sys.exit(1)
+
     if args.file:
         if not args.file.endswith(".mood"):
             print("Error: Script file must have .mood extension")
@@ -33,7 +44,8 @@ def main():
             sys.exit(1)
         try:
             with open(args.file, 'r') as f:
-                client = MudCmd(args.username, stdin=f)
+                client = MudCmd(args.username, stdin=f, throttle=args.throttle,
+                                redraw_rate=args.redraw_rate)
                 client.prompt = ""
                 client.use_rawinput = False
                 client.cmdloop()
@@ -41,7 +53,8 @@ def main():
             print(f"Error reading file {args.file}: {e}")
             sys.exit(1)
     else:
-        client = MudCmd(args.username)
+        client = MudCmd(args.username, throttle=args.throttle,
+                        redraw_rate=args.redraw_rate)
         client.cmdloop()
 
 
@@ -0,0 +1,287 @@
+"""Load generator for the MOOD server.
+
+Opens many simulated players against a running server from one asyncio
+event loop. Every player sends a random mix of commands, one at a time,
+waiting for the response before pausing for the think time and sending
+the next. The report gives throughput, round-trip latency percentiles per
+command type, and the lag between sending a ``sayall`` and other players
+receiving its broadcast (all players share one clock, so the lag is exact).
+
+Usage::
+
+    mood-bench --players 2000 --duration 30 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+from ..common.framing import FrameDecoder, encode_frame, read_frame
+
+DEFAULT_MIX = {"move": 4, "addmon": 1, "attack": 2, "sayall": 1}
+PERCENTILES = (50, 95, 99)
+STAMP = "bench:"
+STAMP_RE = re.compile(re.escape(STAMP) + r"(\d+)")
+CONNECT_CONCURRENCY = 100
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """Parse a command mix like ``move=4,sayall=1``.
+
+    Raises:
+        ValueError: If a command is unknown or a weight is not positive.
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown command in mix: {name}")
+        mix[name] = int(weight or 1)
+        if mix[name] <= 0:
+            raise ValueError(f"Weight of {name} must be positive")
+    return mix
+
+
+def summarize(samples: List[float], duration: float) -> Dict[str, float]:
+    """Get the count, rate and latency percentiles of samples in seconds.
+
+    Percentiles use the nearest-rank method and are reported in
+    milliseconds.
+    """
+    ordered = sorted(samples)
+    result = {"count": len(ordered),
+              "rate": len(ordered) / duration if duration else 0.0}
+    for p in PERCENTILES:
+        rank = max(0, -(-p * len(ordered) // 100) - 1)
+        result[f"p{p}_ms"] = ordered[rank] * 1000 if ordered else None
+    result["max_ms"] = ordered[-1] * 1000 if ordered else None
+    return result
+
+
+class BenchPlayer:
+    """One simulated player connection."""
+
+    def __init__(self, bench: "Bench", username: str):
+        """Initialize a player of a benchmark run."""
+        self.bench = bench
+        self.username = username
+        self.width = self.height = 1
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._last_id = 0
+        self._closed = False
+
+    async def run(self, connect: asyncio.Semaphore) -> None:
+        """Connect, send commands until the benchmark ends, and disconnect."""
+        bench = self.bench
+        decoder = FrameDecoder()
+        try:
+            async with connect:
+                reader, writer = await asyncio.open_connection(bench.host,
+                                                               bench.port)
+                writer.write(encode_frame({"username": self.username}))
+                welcome = await read_frame(reader, decoder)
+        except (OSError, ConnectionError) as e:
+            bench.errors.append(f"{self.username}: {e}")
+            return
+        if welcome.get("type") != "welcome":
+            bench.errors.append(f"{self.username}: {welcome.get('message')}")
+            writer.close()
+            return
+        self.width = welcome.get("width", 1)
+        self.height = welcome.get("height", 1)
+        bench.connected += 1
+        listener = asyncio.ensure_future(self._listen(reader, decoder))
+        try:
+            await bench.started.wait()
+            while not bench.stopped.is_set():
+                await self._command(writer)
+                await asyncio.sleep(random.expovariate(1 / bench.think)
+                                    if bench.think else 0)
+        except (OSError, ConnectionError) as e:
+            bench.errors.append(f"{self.username}: {e}")
+        finally:
+            listener.cancel()
+            writer.close()
+
+    async def _command(self, writer: asyncio.StreamWriter) -> None:
+        bench = self.bench
+        kind = random.choices(bench.kinds, bench.weights)[0]
+        if kind == "move":
+            dx, dy = random.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))
+            cmd = {"type": "move", "dx": dx, "dy": dy}
+        elif kind == "addmon":
+            cmd = {"type": "addmon", "x": random.randrange(self.width),
+                   "y": random.randrange(self.height), "name": "tux",
+                   "hello": "Hi", "hp": 10}
+        elif kind == "attack":
+            cmd = {"type": "attack", "name": "tux", "damage": 1}
+        else:
+            cmd = {"type": "sayall",
+                   "message": f"{STAMP}{time.perf_counter_ns()}"}
+        if self._closed:
+            raise ConnectionError("Connection closed")
+        self._last_id += 1
+        cmd["id"] = self._last_id
+        response = self._pending[self._last_id] = (
+            asyncio.get_running_loop().create_future())
+        start = time.perf_counter()
+        writer.write(encode_frame(cmd))
+        await response
+        if not bench.stopped.is_set():
+            bench.latencies[kind].append(time.perf_counter() - start)
+
+    async def _listen(self, reader: asyncio.StreamReader,
+                      decoder: FrameDecoder) -> None:
+        bench = self.bench
+        try:
+            while True:
+                frame = await read_frame(reader, decoder)
+                if frame.get("type") == "broadcast":
+                    if frame.get("event") == "said":
+                        match = STAMP_RE.search(frame.get("message", ""))
+                        if match and not bench.stopped.is_set():
+                            bench.lags.append(
+                                (time.perf_counter_ns() - int(match[1])) / 1e9)
+                    continue
+                # Responses carry the id of their command; encounters with
+                # walking monsters and other pushed frames do not.
+                response = self._pending.pop(frame.get("id"), None)
+                if response is not None and not response.done():
+                    response.set_result(frame)
+        except (OSError, ValueError) as e:
+            self._closed = True
+            for response in self._pending.values():
+                if not response.done():
+                    response.set_exception(ConnectionError(str(e)))
+            self._pending.clear()
+
+
+class Bench:
+    """A benchmark run against one server.
+
+    Attributes:
+        connected (int): Number of players which joined.
+        errors (list): Connection errors.
+        latencies (dict): Round-trip times in seconds per command type.
+        lags (list): Broadcast delivery lags of sayall in seconds.
+    """
+
+    def __init__(self, host: str, port: int, players: int, duration: float,
+                 mix: Dict[str, int], think: float = 0.1,
+                 prefix: str = "bench"):
+        """Configure a benchmark run.
+
+        Args:
+            host (str): Server address.
+            port (int): Server port.
+            players (int): Number of simulated players.
+            duration (float): Seconds to send commands for, once all players
+                have connected.
+            mix (dict): Relative weights of move, addmon, attack and sayall.
+            think (float): Mean pause in seconds between a response and the
+                next command of a player.
+            prefix (str): Prefix of the players' usernames.
+        """
+        self.host = host
+        self.port = port
+        self.players = players
+        self.duration = duration
+        self.mix = mix
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.think = think
+        self.prefix = prefix
+        self.connected = 0
+        self.errors: List[str] = []
+        self.latencies: Dict[str, List[float]] = {kind: [] for kind in mix}
+        self.lags: List[float] = []
+        self.started: Optional[asyncio.Event] = None
+        self.stopped: Optional[asyncio.Event] = None
+
+    async def run(self) -> Dict:
+        """Run the benchmark and get its report."""
+        self.started, self.stopped = asyncio.Event(), asyncio.Event()
+        connect = asyncio.Semaphore(CONNECT_CONCURRENCY)
+        tasks = [asyncio.ensure_future(
+            BenchPlayer(self, f"{self.prefix}{i}").run(connect))
+            for i in range(self.players)]
+        begin = time.perf_counter()
+        while self.connected + len(self.errors) < self.players:
+            await asyncio.sleep(0.05)
+        connect_time = time.perf_counter() - begin
+        self.started.set()
+        await asyncio.sleep(self.duration)
+        self.stopped.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return self.report(connect_time)
+
+    def report(self, connect_time: float) -> Dict:
+        """Build the JSON-serializable report of the run."""
+        commands = {kind: summarize(samples, self.duration)
+                    for kind, samples in self.latencies.items()}
+        total = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "config": {"host": self.host, "port": self.port,
+                       "players": self.players, "duration": self.duration,
+                       "mix": self.mix, "think": self.think},
+            "connected": self.connected,
+            "connect_seconds": connect_time,
+            "errors": len(self.errors),
+            "throughput": total / self.duration if self.duration else 0.0,
+            "commands": commands,
+            "broadcast_lag": summarize(self.lags, self.duration),
+        }
+
+
+def print_report(report: Dict) -> None:
+    """Print a report as a table."""
+    print(f"{report['connected']} players connected in "
+          f"{report['connect_seconds']:.2f} s, {report['errors']} errors")
+    print(f"Throughput: {report['throughput']:.0f} commands/s")
+    print(f"{'':15}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = dict(report["commands"], **{"broadcast lag": report["broadcast_lag"]})
+    for name, row in rows.items():
+        cells = "".join(f"{row[f'p{p}_ms']:10.2f}" if row["count"] else f"{'-':>10}"
+                        for p in PERCENTILES)
+        print(f"{name:15}{row['count']:8}{cells}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run a benchmark with options from the command line."""
+    parser = argparse.ArgumentParser(description="MOOD server load generator")
+    parser.add_argument("--host", default="localhost", help="Server address")
+    parser.add_argument("--port", type=int, default=12345, help="Server port")
+    parser.add_argument("--players", type=int, default=1000,
+                        help="Number of simulated players")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds to send commands for")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Command weights, e.g. move=4,addmon=1,attack=2,"
+                             "sayall=1")
+    parser.add_argument("--think", type=float, default=0.1,
+                        help="Mean pause between commands of a player in seconds")
+    parser.add_argument("--prefix", default="bench",
+                        help="Prefix of the simulated usernames")
+    parser.add_argument("--output", default=None, metavar="PATH",
+                        help="Write the report as JSON to PATH")
+    args = parser.parse_args(argv)
+    if args.players < 1 or args.duration <= 0:
+        print("Error: players and duration must be positive")
+        sys.exit(1)
+
+    bench = Bench(args.host, args.port, args.players, args.duration, args.mix,
+                  args.think, args.prefix)
+    report = asyncio.run(bench.run())
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,46 @@
 
 This module implements the command-line interface and network communication
 for the MOOD game client, allowing players to interact with the game server.
+
+The network and the display run on one asyncio event loop in the main
+thread: a task reads the server stream into a RenderBuffer, which is
+flushed to the terminal a limited number of times per second, and commands
+are written straight to the stream. Only the blocking line input runs in a
+helper thread, which hands each line over to the loop, so a flood of
+broadcasts never waits for the player to finish typing and vice versa.
 """
 
-import socket
+import asyncio
 import cmd
 import shlex
 import cowsay
-import json
 import sys
 import threading
 import readline
 import time
 import webbrowser
-from typing import Optional, TextIO
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from ..common.framing import FrameDecoder, encode_frame, read_frame
+from ..common.models import WORLD_HEIGHT, WORLD_WIDTH
+from .render import REDRAW_RATE, RenderBuffer, encounter_art
+
+
+class StreamSocket:
+    """Socket-like wrapper of the writing end of an asyncio stream."""
 
-from ..common.models import cow_files
+    def __init__(self, writer: asyncio.StreamWriter):
+        """Wrap a stream writer."""
+        self.writer = writer
+
+    def send(self, data: bytes) -> int:
+        """Queue bytes for sending without blocking."""
+        self.writer.write(data)
+        return len(data)
+
+    def close(self) -> None:
+        """Close the stream once the queued bytes are sent."""
+        self.writer.close()
 
 
 class MudCmd(cmd.Cmd):
@@ -26,33 +51,60 @@ class MudCmd(cmd.Cmd):
         username (str): The player's username.
         valid_monsters (list): List of valid monster names from cowsay and jgsbat.
         weapons (dict): Mapping of weapon names to their damage values.
-        sock (Optional[socket.socket]): Socket for server communication.
+        loop (asyncio.AbstractEventLoop): Event loop running the client.
+        sock (Optional[StreamSocket]): Stream for sending to the server.
         connected (bool): Indicates if the client is connected to the server.
-        receiver_thread (Optional[threading.Thread]):
-        Thread for receiving server messages.
+        receiver (Optional[asyncio.Task]): Task receiving server messages.
+        decoder (FrameDecoder): Splits the server stream into messages.
+        world_width (int): World width announced by the server.
+        world_height (int): World height announced by the server.
+        locales (list): Locales offered by the server, for completion.
         last_command_time (float):
         Timestamp of the last sent command for delay enforcement.
+        throttle (bool): Whether to send at most one command per second;
+        the server limits the rate of commands either way.
+        pending (dict): Futures of the submitted commands awaiting a
+        response, by command id.
+        output (RenderBuffer): Messages waiting to be displayed.
+        redraw_interval (float): Minimum seconds between two flushes of
+        the output to the terminal.
     """
     try:
         prompt = "(" + sys.argv[1] + ") "
     except Exception:
         prompt = "(MUD) "
 
-    def __init__(self, username: str, stdin: Optional[TextIO] = None):
+    def __init__(self, username: str, stdin: Optional[TextIO] = None,
+                 throttle: bool = True, redraw_rate: float = REDRAW_RATE):
         """Initialize the MOOD client.
 
         Args:
             username: The player's username.
             stdin: Optional file object to read commands from (default: sys.stdin).
+            throttle: Wait a second between commands, as older servers expect.
+            redraw_rate: Maximum number of output flushes per second.
         """
         super().__init__(stdin=stdin)
         self.username = username
         self.valid_monsters = cowsay.list_cows() + ["jgsbat"]
         self.weapons = {"sword": 10, "spear": 15, "axe": 20}
-        self.sock: Optional[socket.socket] = None
+        self.loop = asyncio.new_event_loop()
+        self.sock: Optional[StreamSocket] = None
         self.connected = False
-        self.receiver_thread: Optional[threading.Thread] = None
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.receiver: Optional[asyncio.Task] = None
         self.last_command_time = 0.0
+        self.throttle = throttle
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.last_id = 0
+        self.output = RenderBuffer()
+        self.redraw_interval = 1 / redraw_rate
+        self.last_flush = 0.0
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.decoder = FrameDecoder()
+        self.world_width = WORLD_WIDTH
+        self.world_height = WORLD_HEIGHT
+        self.locales: List[str] = []
         if not self.connect():
             print("Failed to connect to server. Exiting.")
             sys.exit(1)
@@ -64,71 +116,93 @@ class MudCmd(cmd.Cmd):
             bool: True if connection is successful, False otherwise.
         """
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect(('localhost', 12345))
-            self.sock.send(json.dumps({"username": self.username}).encode() + b"\n")
-
-            data = b""
-            while True:
-                chunk = self.sock.recv(1024)
-                if not chunk:
-                    self.sock.close()
-                    return False
-                data += chunk
-                try:
-                    response = json.loads(data.decode())
-                    break
-                except json.JSONDecodeError:
-                    continue
-
-            if response.get("type") == "error":
-                print(f"Authentication error: {response.get('message')}")
-                self.sock.close()
-                return False
-
-            print(response.get("message", "Connected to server"))
-            self.connected = True
-            self.receiver_thread = threading.Thread(
-                target=self.receive_messages, daemon=True
-            )
-            self.receiver_thread.start()
-            return True
+            return self.loop.run_until_complete(self.open_connection())
         except Exception as e:
             print(f"Connection error: {e}")
             if self.sock:
                 self.sock.close()
             return False
 
-    def receive_messages(self) -> None:
-        """Receive and process messages from the server."""
-        while self.connected:
-            try:
-                data = b""
-                while self.connected:
-                    chunk = self.sock.recv(1024)
-                    if not chunk:
-                        print("\nDisconnected from server")
-                        self.connected = False
-                        break
-                    data += chunk
-                    try:
-                        message = json.loads(data.decode())
-                        data = b""
-                        current_line = readline.get_line_buffer()
-                        sys.stdout.write('\r' + ' ' * (
-                            len(self.prompt) + len(current_line)
-                        ) + '\r')
-                        sys.stdout.flush()
-                        self.display_message(message)
-                        sys.stdout.write(self.prompt + current_line)
-                        sys.stdout.flush()
-                        readline.redisplay()
-                        break
-                    except json.JSONDecodeError:
-                        continue
-            except Exception as e:
-                print(f"\nError receiving message: {e}")
-                self.connected = False
+    async def open_connection(self) -> bool:
+        """Open the stream and log in."""
+        reader, writer = await asyncio.open_connection('localhost', 12345)
+        self.sock = StreamSocket(writer)
+        self.sock.send(encode_frame({"username": self.username}))
+        response = await read_frame(reader, self.decoder)
+
+        if response.get("type") == "error":
+            print(f"Authentication error: {response.get('message')}")
+            self.sock.close()
+            return False
+
+        print(response.get("message", "Connected to server"))
+        self.world_width = response.get("width", WORLD_WIDTH)
+        self.world_height = response.get("height", WORLD_HEIGHT)
+        self.locales = response.get("locales", [])
+        self.connected = True
+        self.reader = reader
+        return True
+
+    async def receive_messages(self, reader: asyncio.StreamReader) -> None:
+        """Receive and process messages from the server until it disconnects."""
+        decoder = self.decoder
+        try:
+            while self.connected:
+                messages = [await read_frame(reader, decoder)]
+                messages.extend(decoder.ready)
+                decoder.ready.clear()
+                self.handle_messages(messages)
+        except ConnectionError:
+            self.flush()
+            if self.connected:
+                print("\nDisconnected from server")
+        except Exception as e:
+            self.flush()
+            print(f"\nError receiving message: {e}")
+        finally:
+            self.connected = False
+            pending, self.pending = self.pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError("Disconnected from server"))
+
+    def handle_messages(self, messages: Iterable[dict]) -> None:
+        """Resolve the responses to submitted commands and buffer the rest.
+
+        The buffered messages are flushed redraw_interval after the last
+        flush, or right away if that has already passed.
+        """
+        for message in messages:
+            future = self.pending.pop(message.get("id"), None)
+            if future is None:
+                self.output.add(message)
+            elif not future.done():
+                future.set_result(message)
+        if self.output and self.flush_handle is None:
+            delay = self.last_flush + self.redraw_interval - time.monotonic()
+            self.flush_handle = self.loop.call_later(max(delay, 0), self.flush)
+
+    def flush(self) -> None:
+        """Display the buffered messages, redrawing the input line once."""
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        self.last_flush = time.monotonic()
+        messages, summaries = self.output.take()
+        if not messages and not summaries:
+            return
+        current_line = readline.get_line_buffer()
+        sys.stdout.write('\r' + ' ' * (
+            len(self.prompt) + len(current_line)
+        ) + '\r')
+        for message in messages:
+            self.display_message(message)
+        for summary in summaries:
+            print(f"\n{summary}")
+        sys.stdout.write(self.prompt + current_line)
+        sys.stdout.flush()
+        readline.redisplay()
 
     def display_message(self, message: dict) -> None:
         """Display server messages to the user.
@@ -141,18 +215,15 @@ class MudCmd(cmd.Cmd):
             print(f"\n[BROADCAST] {message.get('message')}")
         elif t in ("position", "attack_result", "added_monster", "sayall_result",
                    "timer_result", "monster_move", "movemonsters_result",
-                   "locale_result", "help_result"):
+                   "locale_result", "help_result", "stats_result"):
             print(f"\n{message.get('message')}")
         elif t == "encounter":
-            print("\n" + cowsay.cowsay(
-                message["hello"],
-                cow=cow_files.get(message["name"], message["name"])
-            ))
+            print("\n" + encounter_art(message["name"], message["hello"]))
         elif t == "error":
             print(f"\nError: {message.get('message', 'Unknown error')}")
 
     def send_command(self, cmd_obj: dict) -> bool:
-        """Send a command to the server with a minimum 1-second delay.
+        """Send a command to the server without waiting for it to be sent.
 
         Args:
             cmd_obj: The command to send.
@@ -164,19 +235,130 @@ class MudCmd(cmd.Cmd):
             print("Not connected to server")
             return False
 
-        current_time = time.time()
-        if current_time - self.last_command_time < 1:
-            time.sleep(1 - (current_time - self.last_command_time))
-        self.last_command_time = time.time()
-
         try:
-            self.sock.send(json.dumps(cmd_obj).encode() + b"\n")
+            self.sock.send(encode_frame(cmd_obj))
+            self.last_command_time = time.monotonic()
             return True
         except Exception as e:
             print(f"Error sending command: {e}")
             self.connected = False
             return False
 
+    def submit(self, cmd_obj: dict) -> Optional[asyncio.Future]:
+        """Send a command tagged with a new id without waiting for the response.
+
+        Any number of submitted commands may be in flight at once; each
+        response is matched to its command by the id echoed by the server
+        and is not displayed.
+
+        Args:
+            cmd_obj: The command to send.
+
+        Returns:
+            asyncio.Future: Resolves to the response, or None if sending
+            failed.
+        """
+        self.last_id += 1
+        request_id = self.last_id
+        future = self.pending[request_id] = self.loop.create_future()
+        if not self.send_command(dict(cmd_obj, id=request_id)):
+            del self.pending[request_id]
+            return None
+        return future
+
+    def cmdloop(self, intro: Optional[str] = None) -> None:
+        """Run the command loop and the network on the event loop."""
+        try:
+            self.loop.run_until_complete(self.interact(intro))
+        finally:
+            self.close()
+
+    async def interact(self, intro: Optional[str] = None) -> None:
+        """Read and run commands until one of them stops the loop.
+
+        Works like cmd.Cmd.cmdloop, except that each line is read in a
+        helper thread while the event loop receives and displays messages. With
+        throttling on, a command is run at least a second after the last
+        one was sent, and the messages arriving meanwhile are displayed.
+        """
+        if self.reader is not None and self.receiver is None:
+            self.receiver = self.loop.create_task(
+                self.receive_messages(self.reader))
+        self.preloop()
+        old_completer = None
+        if self.use_rawinput and self.completekey:
+            old_completer = readline.get_completer()
+            readline.set_completer(self.complete)
+            readline.parse_and_bind(self.completekey + ": complete")
+        try:
+            if intro is not None:
+                self.intro = intro
+            if self.intro:
+                self.stdout.write(str(self.intro) + "\n")
+            stop = None
+            while not stop:
+                if self.cmdqueue:
+                    line = self.cmdqueue.pop(0)
+                else:
+                    line = await self.read_line()
+                if self.throttle:
+                    await asyncio.sleep(
+                        self.last_command_time + 1 - time.monotonic())
+                line = self.precmd(line)
+                stop = self.onecmd(line)
+                stop = self.postcmd(stop, line)
+            self.postloop()
+        finally:
+            if old_completer is not None:
+                readline.set_completer(old_completer)
+
+    def read_line(self) -> asyncio.Future:
+        """Read the next input line in a helper thread.
+
+        The thread is a daemon, so a pending read does not keep the process
+        alive after the loop has stopped.
+
+        Returns:
+            asyncio.Future: Resolves to the line, or "EOF" at end of input.
+        """
+        future = self.loop.create_future()
+
+        def read() -> None:
+            try:
+                if self.use_rawinput:
+                    try:
+                        line = input(self.prompt)
+                    except EOFError:
+                        line = "EOF"
+                else:
+                    self.stdout.write(self.prompt)
+                    self.stdout.flush()
+                    line = self.stdin.readline()
+                    line = line.rstrip("\r\n") if line else "EOF"
+            except Exception as e:
+                self.loop.call_soon_threadsafe(future.set_exception, e)
+            else:
+                self.loop.call_soon_threadsafe(future.set_result, line)
+
+        threading.Thread(target=read, daemon=True).start()
+        return future
+
+    def close(self) -> None:
+        """Stop receiving, let the queued commands go out and close the loop."""
+        self.connected = False
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+        closing = []
+        if self.receiver is not None:
+            self.receiver.cancel()
+            closing.append(self.receiver)
+        if self.sock is not None:
+            self.sock.close()
+            closing.append(self.sock.writer.wait_closed())
+        self.loop.run_until_complete(
+            asyncio.gather(*closing, return_exceptions=True))
+        self.loop.close()
+
     def do_move(self, direction: str) -> None:
         """Move the player in the specified direction."""
         moves = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
@@ -228,7 +410,8 @@ class MudCmd(cmd.Cmd):
                     return
             if not all(k in params for k in ("hello", "hp", "x", "y")) or \
                params["hp"] <= 0 or not \
-                    (0 <= params["x"] <= 9 and 0 <= params["y"] <= 9):
+                    (0 <= params["x"] < self.world_width
+                     and 0 <= params["y"] < self.world_height):
                 print("Invalid parameters")
                 return
             self.send_command({
@@ -327,9 +510,15 @@ class MudCmd(cmd.Cmd):
 
     def complete_locale(self, text: str, line: str,
                         begidx: int, endidx: int) -> list[str]:
-        """Provide tab completion for locale."""
-        locales = ["en_US", "ru_RU"]
-        return [loc for loc in locales if loc.startswith(text)]
+        """Provide tab completion for the locales offered by the server."""
+        return [loc for loc in self.locales if loc.startswith(text)]
+
+    def do_stats(self, arg: str) -> None:
+        """Request server statistics."""
+        if arg:
+            print("Stats command takes no arguments")
+            return
+        self.send_command({"type": "stats"})
 
     def do_help(self, arg: str) -> None:
         """Request help from the server."""
@@ -340,7 +529,7 @@ class MudCmd(cmd.Cmd):
         """Provide tab completion for help."""
         commands = [
             "EOF", "attack", "help", "locale", "movemonsters", "right", "timer",
-            "addmon", "down", "left", "move", "quit", "sayall", "up"
+            "addmon", "down", "left", "move", "quit", "sayall", "stats", "up"
         ]
         return [cmd for cmd in commands if cmd.startswith(text)]
 
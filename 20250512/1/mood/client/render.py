@@ -0,0 +1,116 @@
+"""Coalescing of the MOOD client's terminal output.
+
+Messages from the server are not printed as they arrive but collected in a
+RenderBuffer, which the client flushes at most REDRAW_RATE times per
+second, clearing and redrawing the input line once per flush. Position
+updates may come in floods (every step of every visible monster), so only
+the first FLOOD_LIMIT moves of each kind are kept per flush and the rest
+are replaced by a line like ``+37 more monster moves``. Everything else,
+including the responses to the player's own commands, is always shown.
+
+The art of a monster encounter is rendered once per monster, greeting and
+width and kept in a bounded LRU cache, since players keep meeting the same
+monsters; the text of each cow is read once per process.
+"""
+import functools
+from typing import Dict, List, Optional, Tuple
+
+import cowsay
+
+from ..common.models import cow_files
+
+REDRAW_RATE = 10.0
+FLOOD_LIMIT = 5
+ART_CACHE_SIZE = 256
+ART_WIDTH = 40
+SUMMARIZED = {
+    "moved": "player moves",
+    "monster_moved": "monster moves",
+    "monsters_moved": "monster moves",
+}
+
+
+@functools.lru_cache(maxsize=ART_CACHE_SIZE)
+def cow_text(name: str) -> str:
+    """Get the text of a cow by name, the default cow if there is none."""
+    if name in cow_files:
+        return cow_files[name]
+    try:
+        return cowsay.get_cow(name)
+    except OSError:
+        return cowsay.get_cow("default")
+
+
+@functools.lru_cache(maxsize=ART_CACHE_SIZE)
+def encounter_art(name: str, hello: str, width: int = ART_WIDTH) -> str:
+    """Render a monster saying its greeting.
+
+    The hits and misses of the cache are reported by
+    ``encounter_art.cache_info()``.
+
+    Args:
+        name (str): Name of the monster's cow.
+        hello (str): The greeting.
+        width (int): Width of the speech bubble.
+    """
+    return cowsay.cowsay(hello, cowfile=cow_text(name), width=width)
+
+
+def flood_kind(message: dict) -> Optional[str]:
+    """Get the summary name of a message which may be summarized, or None."""
+    if message.get("type") != "broadcast":
+        return None
+    return SUMMARIZED.get(message.get("event"))
+
+
+class RenderBuffer:
+    """Messages waiting to be displayed, with floods of moves summarized.
+
+    Attributes:
+        flood_limit (int): Moves of each kind shown per flush.
+        messages (list): Messages to display, in order of arrival.
+        hidden (dict): Number of moves left out per kind.
+    """
+
+    def __init__(self, flood_limit: int = FLOOD_LIMIT):
+        """Initialize an empty buffer."""
+        self.flood_limit = flood_limit
+        self.messages: List[dict] = []
+        self.hidden: Dict[str, int] = {}
+        self._shown: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Get the number of messages and summaries waiting."""
+        return len(self.messages) + len(self.hidden)
+
+    def add(self, message: dict) -> None:
+        """Add a message, counting it as hidden if its kind is flooding."""
+        kind = flood_kind(message)
+        if kind is None:
+            self.messages.append(message)
+            return
+        # A batch of monster moves has one line per move.
+        lines = message.get("message", "").split("\n")
+        shown = self._shown.get(kind, 0)
+        room = max(self.flood_limit - shown, 0)
+        if room:
+            if room < len(lines):
+                message = dict(message, message="\n".join(lines[:room]))
+            self.messages.append(message)
+            self._shown[kind] = shown + min(room, len(lines))
+        if len(lines) > room:
+            self.hidden[kind] = self.hidden.get(kind, 0) + len(lines) - room
+
+    def take(self) -> Tuple[List[dict], List[str]]:
+        """Empty the buffer.
+
+        Returns:
+            tuple: The messages to display and the summary lines of the
+                hidden moves.
+        """
+        messages = self.messages
+        summaries = [f"+{count} more {kind}" for kind, count in self.hidden.items()]
+        self.messages = []
+        self.hidden = {}
+        self._shown = {}
+        return messages, summaries
@@ -0,0 +1,126 @@
+"""Newline-delimited JSON framing for the MOOD wire protocol.
+
+Every message on the wire is a JSON object followed by a single newline.
+The decoder keeps the unterminated tail of the stream between reads, so each
+frame is scanned and decoded exactly once no matter how the bytes were split
+into chunks, and several frames arriving in one chunk are all returned.
+"""
+import json
+import socket
+from asyncio import StreamReader
+from collections import deque
+from typing import Deque, Dict, List
+
+MAX_FRAME_SIZE = 64 * 1024
+RECV_SIZE = 64 * 1024
+
+
+class FrameTooLarge(ValueError):
+    """Raised when a frame exceeds the decoder's maximum frame size."""
+
+
+def encode_frame(msg: Dict) -> bytes:
+    """Encode a message as a single newline-terminated frame.
+
+    Args:
+        msg (dict): The message to encode.
+
+    Returns:
+        bytes: The JSON encoded message followed by a newline.
+    """
+    return json.dumps(msg).encode() + b"\n"
+
+
+class FrameDecoder:
+    """Incremental decoder splitting a byte stream into JSON messages.
+
+    Attributes:
+        max_frame_size (int): Largest accepted frame, terminator excluded.
+        ready (Deque[dict]): Decoded messages not yet consumed by
+            :func:`recv_frame` or :func:`read_frame`.
+    """
+
+    def __init__(self, max_frame_size: int = MAX_FRAME_SIZE):
+        """Initialize an empty decoder.
+
+        Args:
+            max_frame_size (int): Largest accepted frame in bytes.
+        """
+        self.max_frame_size = max_frame_size
+        self.ready: Deque[Dict] = deque()
+        self._buffer = bytearray()
+        self._scanned = 0
+
+    def feed(self, data: bytes) -> List[Dict]:
+        """Add received bytes and decode the frames they complete.
+
+        Args:
+            data (bytes): The next chunk of the stream.
+
+        Returns:
+            list: Messages of all frames completed by this chunk, in order.
+
+        Raises:
+            FrameTooLarge: If a frame is longer than max_frame_size.
+            json.JSONDecodeError: If a complete frame is not valid JSON.
+        """
+        buf = self._buffer
+        buf += data
+        messages = []
+        start = 0
+        end = buf.find(b"\n", self._scanned)
+        while end != -1:
+            if end - start > self.max_frame_size:
+                raise FrameTooLarge(f"Frame of {end - start} bytes exceeds "
+                                    f"{self.max_frame_size}")
+            if end > start and not buf[start:end].isspace():
+                messages.append(json.loads(buf[start:end]))
+            start = end + 1
+            end = buf.find(b"\n", start)
+        del buf[:start]
+        self._scanned = len(buf)
+        if self._scanned > self.max_frame_size:
+            raise FrameTooLarge(f"Unterminated frame exceeds {self.max_frame_size}")
+        return messages
+
+
+def recv_frame(sock: socket.socket, decoder: FrameDecoder) -> Dict:
+    """Receive the next message from a blocking socket.
+
+    Args:
+        sock (socket.socket): The socket to read from.
+        decoder (FrameDecoder): The decoder owning this socket's stream.
+
+    Returns:
+        dict: The next decoded message.
+
+    Raises:
+        ConnectionError: If the peer closed the connection.
+    """
+    while not decoder.ready:
+        chunk = sock.recv(RECV_SIZE)
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        decoder.ready.extend(decoder.feed(chunk))
+    return decoder.ready.popleft()
+
+
+async def read_frame(reader: StreamReader, decoder: FrameDecoder) -> Dict:
+    """Read the next message from an asyncio stream.
+
+    Args:
+        reader (asyncio.StreamReader): The stream to read from.
+        decoder (FrameDecoder): The decoder owning this stream.
+
+    Returns:
+        dict: The next decoded message.
+
+    Raises:
+        ConnectionError: If the peer closed the connection.
+    """
+    while not decoder.ready:
+        chunk = await reader.read(RECV_SIZE)
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        decoder.ready.extend(decoder.feed(chunk))
+    return decoder.ready.popleft()
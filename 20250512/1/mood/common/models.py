@@ -17,6 +17,9 @@ EOC
 """))
 cow_files = {"jgsbat": jgsbat}
 
+WORLD_WIDTH = 10
+WORLD_HEIGHT = 10
+
 
 class Person:
     """Base class for game entities with a position.
@@ -68,7 +71,30 @@ class Monster(Person):
 
 
 class Gamer(Person):
-    """A player entity in the game."""
+    """A player entity in the game.
+
+    Attributes:
+        width (int): Width of the wrapped world the player walks in.
+        height (int): Height of the wrapped world the player walks in.
+        on_move (callable): Called as on_move(old, new) with the old and new
+            positions after every move, e.g. to keep position indexes
+            up to date.
+    """
+
+    def __init__(self, x, y, width=WORLD_WIDTH, height=WORLD_HEIGHT,
+                 on_move=None):
+        """Initialize a Gamer with coordinates and world dimensions.
+
+        Args:
+            x (int): The x-coordinate.
+            y (int): The y-coordinate.
+            width (int): Width of the world.
+            height (int): Height of the world.
+            on_move (callable): Optional move listener.
+        """
+        super().__init__(x, y)
+        self.width, self.height = width, height
+        self.on_move = on_move
 
     def move(self, dx, dy):
         """Move the player by the given offsets.
@@ -77,5 +103,8 @@ class Gamer(Person):
             dx (int): Change in x-coordinate.
             dy (int): Change in y-coordinate.
         """
-        self.x = (self.x + dx) % 10
-        self.y = (self.y + dy) % 10
+        old = self.x, self.y
+        self.x = (self.x + dx) % self.width
+        self.y = (self.y + dy) % self.height
+        if self.on_move is not None:
+            self.on_move(old, (self.x, self.y))
@@ -1,10 +1,104 @@
 """Main entry point for running the MOOD game server."""
-from .server import Server
+import argparse
+import logging
 
+from ..common.models import WORLD_HEIGHT, WORLD_WIDTH
+from .aoi import DEFAULT_VIEW_RADIUS
+from .logs import LEVELS, parse_sample, setup_logging
+from .outbox import DEFAULT_QUEUE_SIZE, OVERFLOW_POLICIES
+from .ratelimit import DEFAULT_LIMITS, RATE_POLICIES, parse_limits
+from .server import ENGINES, Server
+from .snapshot import SNAPSHOT_INTERVAL
+from .world import MAX_WORLD_SIZE
 
-if __name__ == "__main__":
-    server = Server()
+
+def main():
+    """Run the MOOD server with options from the command line."""
+    parser = argparse.ArgumentParser(description="MOOD game server")
+    parser.add_argument("--host", default="localhost", help="Address to bind to")
+    parser.add_argument("--port", type=int, default=12345, help="Port to listen on")
+    parser.add_argument("--engine", choices=ENGINES, default=None,
+                        help="Connection handling engine (default: asyncio, "
+                             "threads with --striped)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Maximum number of frames queued for one client")
+    parser.add_argument("--overflow", choices=OVERFLOW_POLICIES, default="drop",
+                        help="What to do when a client's queue is full")
+    parser.add_argument("--tick", type=float, default=None,
+                        help="Server tick in seconds for batched writes, "
+                             "e.g. 0.05 (default: write immediately)")
+    parser.add_argument("--view-radius", type=int, default=DEFAULT_VIEW_RADIUS,
+                        help="Distance in cells within which players see movement")
+    parser.add_argument("--width", type=int, default=WORLD_WIDTH,
+                        help=f"World width in cells, up to {MAX_WORLD_SIZE}")
+    parser.add_argument("--height", type=int, default=WORLD_HEIGHT,
+                        help=f"World height in cells, up to {MAX_WORLD_SIZE}")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="Move all monsters on every tick using numpy")
+    parser.add_argument("--striped", action="store_true",
+                        help="Guard the game with fine-grained locks so client "
+                             "threads run in parallel (for no-GIL builds); "
+                             "requires the threads engine")
+    parser.add_argument("--snapshot", default=None, metavar="PATH",
+                        help="Restore the world from this file at startup "
+                             "and save snapshots of it periodically")
+    parser.add_argument("--snapshot-interval", type=float,
+                        default=SNAPSHOT_INTERVAL,
+                        help="Seconds between world snapshots")
+    parser.add_argument("--journal", default=None, metavar="PATH",
+                        help="Journal state-changing commands to files starting "
+                             "with PATH and replay them at startup")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="Record the session to PATH for "
+                             "python -m mood.server.playback")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed of the monster movement (default: random)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve metrics in the Prometheus text format on "
+                             "http://HOST:PORT/metrics")
+    parser.add_argument("--admin", action="append", default=[], metavar="NAME",
+                        help="Allow the named player to use the stats command; "
+                             "may be repeated. Nobody may use it by default")
+    parser.add_argument("--rate-limit", type=parse_limits, default=DEFAULT_LIMITS,
+                        metavar="TYPE=RATE/BURST,...",
+                        help="Token buckets limiting each client's commands per "
+                             "second, by command type or 'default' "
+                             "(default: default=20/40)")
+    parser.add_argument("--no-rate-limit", action="store_const", const={},
+                        dest="rate_limit", help="Do not limit client commands")
+    parser.add_argument("--rate-policy", choices=RATE_POLICIES, default="defer",
+                        help="Delay or reject commands over the rate limit")
+    parser.add_argument("--log-level", choices=LEVELS, default="INFO",
+                        help="Lowest level of the log records written to stderr")
+    parser.add_argument("--log-sample", type=parse_sample, default={},
+                        metavar="CATEGORY=RATE,...",
+                        help="Keep only a fraction of the DEBUG and INFO records "
+                             "of categories, e.g. translations=0.01")
+    args = parser.parse_args()
+    if args.engine is None:
+        args.engine = "threads" if args.striped else "asyncio"
+    elif args.striped and args.engine != "threads":
+        parser.error("--striped requires --engine threads")
+
+    listener = setup_logging(args.log_level, args.log_sample)
     try:
+        server = Server(args.host, args.port, engine=args.engine,
+                        queue_size=args.queue_size, overflow=args.overflow,
+                        tick=args.tick, view_radius=args.view_radius,
+                        width=args.width, height=args.height,
+                        vectorized=args.vectorized, striped=args.striped,
+                        snapshot=args.snapshot,
+                        snapshot_interval=args.snapshot_interval,
+                        journal=args.journal, record=args.record,
+                        seed=args.seed, metrics_port=args.metrics_port,
+                        admins=args.admin, rate_limits=args.rate_limit,
+                        rate_policy=args.rate_policy)
         server.start_server()
     except KeyboardInterrupt:
-        print("Shutting down server")
+        logging.getLogger("mood.server").info("Shutting down server")
+    finally:
+        listener.stop()
+
+
+if __name__ == "__main__":
+    main()
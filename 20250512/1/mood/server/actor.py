@@ -0,0 +1,151 @@
+"""Single-writer command actor of the MOOD server.
+
+Connection handlers and timers do not touch the game state themselves.
+Every change is submitted to the actor as a command, a function applied to
+the game, and the actor's owner applies commands one at a time in the order
+they were submitted. Game logic therefore needs no locks, and the order of
+commands fully determines the resulting state.
+
+The owner is either a dedicated thread (start_thread) or an asyncio event
+loop (attach), in which case commands run as loop callbacks. InlineActor
+instead applies commands right away in the calling thread, for a game which
+does its own locking.
+"""
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Tuple
+
+Command = Tuple[Optional[Future], Callable, Tuple]
+
+log = logging.getLogger(__name__)
+
+
+class GameActor:
+    """Queue of game commands applied in order by a single owner.
+
+    Attributes:
+        game: The state owned by the actor.
+        applied (int): Number of commands applied so far.
+    """
+
+    def __init__(self, game):
+        """Initialize an actor with an empty queue and no owner.
+
+        Args:
+            game: The state owned by the actor.
+        """
+        self.game = game
+        self.applied = 0
+        self._inbox: "queue.SimpleQueue[Optional[Command]]" = queue.SimpleQueue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Queue a command and get a future for its result.
+
+        Args:
+            func (callable): Function to apply.
+            *args: Arguments for the function.
+
+        Returns:
+            concurrent.futures.Future: Result or exception of the command.
+        """
+        future: Future = Future()
+        self._put((future, func, args))
+        return future
+
+    def post(self, func: Callable, *args) -> None:
+        """Queue a command whose result nobody waits for."""
+        self._put((None, func, args))
+
+    def call(self, func: Callable, *args) -> Any:
+        """Queue a command and block until the owner has applied it."""
+        return self.submit(func, *args).result()
+
+    async def call_async(self, func: Callable, *args) -> Any:
+        """Queue a command and wait for it without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def _put(self, command: Optional[Command]) -> None:
+        self._inbox.put(command)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.run_pending)
+
+    def _apply(self, command: Command) -> None:
+        future, func, args = command
+        if future is not None and not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = func(*args)
+        except Exception as e:
+            if future is None:
+                log.exception("Game command error: %s", e)
+            else:
+                future.set_exception(e)
+        else:
+            if future is not None:
+                future.set_result(result)
+        self.applied += 1
+
+    def run_pending(self) -> int:
+        """Apply every queued command without waiting for new ones.
+
+        Returns:
+            int: Number of commands applied.
+        """
+        count = 0
+        while True:
+            try:
+                command = self._inbox.get_nowait()
+            except queue.Empty:
+                return count
+            if command is not None:
+                self._apply(command)
+                count += 1
+
+    def run_forever(self) -> None:
+        """Apply commands as they arrive until stop() is called."""
+        while True:
+            command = self._inbox.get()
+            if command is None:
+                return
+            self._apply(command)
+
+    def start_thread(self) -> threading.Thread:
+        """Make a new daemon thread the owner of the game."""
+        thread = threading.Thread(target=self.run_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Make an event loop the owner of the game."""
+        self._loop = loop
+        loop.call_soon_threadsafe(self.run_pending)
+
+    def stop(self) -> None:
+        """Stop the owner thread after the commands already queued."""
+        self._loop = None
+        self._inbox.put(None)
+
+
+class InlineActor(GameActor):
+    """Actor applying every command immediately in the calling thread.
+
+    Used with StripedGame, which guards its own state, so that client
+    threads can run game commands in parallel.
+    """
+
+    def _put(self, command: Optional[Command]) -> None:
+        if command is not None:
+            self._apply(command)
+
+    def start_thread(self) -> None:
+        """Do nothing; every calling thread is an owner."""
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Do nothing; commands never wait for the loop."""
+
+    def stop(self) -> None:
+        """Do nothing; there is no owner to stop."""
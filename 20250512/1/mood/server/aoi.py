@@ -0,0 +1,118 @@
+"""Area-of-interest index of the MOOD server.
+
+Players are bucketed into square cells of the size of the view radius, so
+finding everyone who can see a cell only looks at the buckets around it
+instead of scanning all players.
+"""
+from collections import defaultdict
+from typing import DefaultDict, Dict, Iterator, List, Sequence, Set, Tuple
+
+from ..common.models import WORLD_HEIGHT, WORLD_WIDTH
+
+Position = Tuple[int, int]
+DEFAULT_VIEW_RADIUS = 5
+
+
+class InterestGrid:
+    """Spatial index of player positions on a wrapped (torus) world.
+
+    Attributes:
+        radius (int): View radius in cells; a player sees every cell within
+            this Chebyshev distance, taking wrapping into account.
+        width (int): World width in cells.
+        height (int): World height in cells.
+        bucket_size (int): Side of a bucket in cells.
+    """
+
+    def __init__(self, radius: int = DEFAULT_VIEW_RADIUS,
+                 width: int = WORLD_WIDTH, height: int = WORLD_HEIGHT):
+        """Initialize an empty index.
+
+        Args:
+            radius (int): View radius in cells.
+            width (int): World width in cells.
+            height (int): World height in cells.
+        """
+        self.radius = radius
+        self.width = width
+        self.height = height
+        self.bucket_size = max(radius, 1)
+        self._buckets: DefaultDict[Position, Set[str]] = defaultdict(set)
+        self._positions: Dict[str, Position] = {}
+
+    def _bucket(self, pos: Position) -> Position:
+        return pos[0] // self.bucket_size, pos[1] // self.bucket_size
+
+    def add(self, username: str, pos: Position) -> None:
+        """Add a player at a position."""
+        self._positions[username] = pos
+        self._buckets[self._bucket(pos)].add(username)
+
+    def remove(self, username: str) -> None:
+        """Remove a player from the index."""
+        pos = self._positions.pop(username, None)
+        if pos is None:
+            return
+        bucket = self._bucket(pos)
+        self._buckets[bucket].discard(username)
+        if not self._buckets[bucket]:
+            del self._buckets[bucket]
+
+    def move(self, username: str, pos: Position) -> None:
+        """Update the position of a player."""
+        old = self._positions.get(username)
+        if old is not None and self._bucket(old) == self._bucket(pos):
+            self._positions[username] = pos
+            return
+        self.remove(username)
+        self.add(username, pos)
+
+    def _axis_buckets(self, c: int, extent: int) -> Sequence[int]:
+        """Get bucket indices covering [c - radius, c + radius] on one axis."""
+        size, r = self.bucket_size, self.radius
+        if 2 * r + 1 >= extent:
+            return range((extent - 1) // size + 1)
+        lo, hi = (c - r) % extent, (c + r) % extent
+        if lo <= hi:
+            return range(lo // size, hi // size + 1)
+        return sorted({*range(lo // size, (extent - 1) // size + 1),
+                       *range(hi // size + 1)})
+
+    def _nearby_buckets(self, pos: Position) -> List[Position]:
+        """Get all buckets overlapping the view square around a position."""
+        ys = self._axis_buckets(pos[1], self.height)
+        return [(bx, by) for bx in self._axis_buckets(pos[0], self.width)
+                for by in ys]
+
+    def watched_buckets(self) -> Set[Position]:
+        """Get the buckets holding cells which some player may see.
+
+        The result may include a few buckets nobody can actually see, so it
+        only serves to rule cells out before checking them with near().
+        """
+        size = self.bucket_size
+        columns = (self.width - 1) // size + 1
+        rows = (self.height - 1) // size + 1
+        # Two buckets either way: a partial last bucket may be narrower
+        # than the radius, so the view can reach past it when wrapping.
+        return {((bx + dx) % columns, (by + dy) % rows)
+                for bx, by in self._buckets
+                for dx in range(-2, 3) for dy in range(-2, 3)}
+
+    def near(self, pos: Position) -> Iterator[str]:
+        """Iterate over players who can see a position.
+
+        Args:
+            pos (tuple): The (x, y) cell of an event.
+
+        Yields:
+            str: Usernames of players within the view radius.
+        """
+        x, y = pos
+        for bucket in self._nearby_buckets(pos):
+            for username in self._buckets.get(bucket, ()):
+                px, py = self._positions[username]
+                dx, dy = abs(px - x), abs(py - y)
+                if (min(dx, self.width - dx) <= self.radius
+                        and min(dy, self.height - dy) <= self.radius):
+                    yield username
@@ -0,0 +1,108 @@
+"""Broadcast events of the MOOD server.
+
+Broadcasts are passed around as structured events: a message id and its
+arguments. Text is produced only when an event is rendered for a locale, so
+one broadcast is translated and encoded once per locale rather than once
+per recipient.
+"""
+import gettext
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from ..common.framing import encode_frame
+
+
+def N_(message: str) -> str:
+    """Mark a message for extraction without translating it."""
+    return message
+
+
+ATTACK_KILLED = N_("%s attacked %s with %s, dealing %d damage. %s was killed!")
+
+TEMPLATES: Dict[str, str] = {
+    "joined": N_("%s joined the game!"),
+    "left": N_("%s left the game!"),
+    "added": N_("%s added %s at (%d,%d) saying %s"),
+    "moved": N_("%s moved to (%d,%d)"),
+    "monster_moved": N_("Monster %s moved one cell %s"),
+    "said": "%s: %s",
+}
+LOW_PRIORITY = frozenset(("moved", "monster_moved", "monsters_moved"))
+
+
+class Event(NamedTuple):
+    """A broadcast event.
+
+    Attributes:
+        name (str): The message id, a key of TEMPLATES, "attacked" or
+            "monsters_moved".
+        args (tuple): Arguments substituted into the message; for
+            "monsters_moved", a tuple of (monster name, direction) pairs.
+    """
+
+    name: str
+    args: Tuple = ()
+
+
+def render(event: Event, t: gettext.NullTranslations) -> str:
+    """Render an event as text in the language of a translation.
+
+    Args:
+        event (Event): The event to render.
+        t (gettext.NullTranslations): Translation of the target locale.
+
+    Returns:
+        str: The localized message text.
+    """
+    if event.name == "attacked":
+        user, name, weapon, dealt, hp = event.args
+        if hp == 0:
+            return t.gettext(ATTACK_KILLED) % (user, name, weapon, dealt, name)
+        return t.ngettext(
+            "%s attacked %s with %s, dealing %d damage. %s has %d HP remaining.",
+            "%s attacked %s with %s, dealing %d damage. %s has %d HP remaining.",
+            hp) % (user, name, weapon, dealt, name, hp)
+    if event.name == "monsters_moved":
+        template = t.gettext(TEMPLATES["monster_moved"])
+        return "\n".join(template % move for move in event.args)
+    template = TEMPLATES[event.name]
+    if event.name == "said":
+        return template % event.args
+    return t.gettext(template) % event.args
+
+
+def encode_event(event: Event, t: gettext.NullTranslations) -> bytes:
+    """Render an event and encode it as a broadcast frame.
+
+    Args:
+        event (Event): The event to encode.
+        t (gettext.NullTranslations): Translation of the target locale.
+
+    Returns:
+        bytes: The newline-terminated broadcast message.
+    """
+    return encode_frame({
+        "type": "broadcast",
+        "event": event.name,
+        "message": render(event, t)
+    })
+
+
+def coalesce_key(event: Event) -> Optional[Tuple[str, str]]:
+    """Get the coalescing key of a low-priority event.
+
+    Position updates are low priority: when a client falls behind, only the
+    latest position of each player or monster matters. A batch of monster
+    moves replaces the previous batch as a whole.
+
+    Args:
+        event (Event): The event.
+
+    Returns:
+        tuple: (event name, mover name), or None if the event must be
+        delivered.
+    """
+    if event.name == "monsters_moved":
+        return event.name, ""
+    if event.name in LOW_PRIORITY:
+        return event.name, event.args[0]
+    return None
@@ -0,0 +1,175 @@
+"""Command journal of the MOOD server.
+
+Every state-changing client command is appended to the journal once it has
+been applied, before its response is sent. Appending only buffers the
+record; once per server tick commit() hands the buffer to a writer thread
+which writes and fsyncs it in one go (group commit), so durability costs
+one fsync per tick instead of one per command, and a crash loses at most
+the commands of the last tick. Besides the commands, the journal holds a
+join and a leave record for every session of a player and the seed of every
+monster step, so replaying it rebuilds the world the players saw.
+
+The journal is a sequence of segment files ``<path>.<first seq>`` holding
+one JSON record per line. A new segment is started whenever a snapshot is
+taken, and segments covered by a written snapshot are deleted. On restart
+the server restores the snapshot and replays the records after it.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterator, List, Tuple
+
+JOURNALED = frozenset(("addmon", "attack", "move", "movemonsters", "locale"))
+
+log = logging.getLogger(__name__)
+
+
+def segments(path: str) -> List[Tuple[int, str]]:
+    """Get the segment files of a journal.
+
+    Args:
+        path (str): Journal path prefix.
+
+    Returns:
+        list: (first seq, file name) pairs in order.
+    """
+    found = []
+    for name in glob.glob(glob.escape(path) + ".*"):
+        suffix = name[len(path) + 1:]
+        if suffix.isdigit():
+            found.append((int(suffix), name))
+    return sorted(found)
+
+
+def read_journal(path: str, after: int = 0) -> Iterator[Tuple[int, str, Dict]]:
+    """Read journal records.
+
+    A record cut short by a crash ends the journal.
+
+    Args:
+        path (str): Journal path prefix.
+        after (int): Skip records with this or a lower seq.
+
+    Yields:
+        tuple: (seq, username, command) of each record.
+    """
+    for _, name in segments(path):
+        with open(name, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                record = json.loads(line)
+                if record["seq"] > after:
+                    yield record["seq"], record["user"], record["cmd"]
+
+
+class Journal:
+    """Append-only command log with group-commit fsync.
+
+    Attributes:
+        path (str): Journal path prefix.
+        seq (int): Seq of the last appended record.
+        commits (int): Number of fsyncs done so far.
+    """
+
+    def __init__(self, path: str, seq: int = 0):
+        """Open a new segment and start the writer thread.
+
+        Args:
+            path (str): Journal path prefix.
+            seq (int): Seq of the last record already in the journal.
+        """
+        self.path = path
+        self.seq = seq
+        self.commits = 0
+        self._buffer = bytearray()
+        self._requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._io = threading.Lock()
+        self._file = self._open_segment()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _open_segment(self):
+        return open(f"{self.path}.{self.seq + 1:012d}", "ab")
+
+    def append(self, user: str, cmd: Dict) -> int:
+        """Buffer a command record until the next commit.
+
+        Args:
+            user (str): Name of the player who sent the command.
+            cmd (dict): The command.
+
+        Returns:
+            int: Seq of the record.
+        """
+        with self._cond:
+            self.seq += 1
+            self._buffer += json.dumps({"seq": self.seq, "user": user,
+                                        "cmd": cmd}).encode() + b"\n"
+            return self.seq
+
+    def commit(self) -> None:
+        """Ask the writer thread to write and fsync the buffered records."""
+        with self._cond:
+            if self._buffer:
+                self._requested = True
+                self._cond.notify()
+
+    def sync(self) -> None:
+        """Write and fsync the buffered records in the calling thread."""
+        with self._io:
+            with self._cond:
+                data, self._buffer = self._buffer, bytearray()
+            if data:
+                self._file.write(data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.commits += 1
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._requested and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                self._requested = False
+            try:
+                self.sync()
+            except OSError as e:
+                log.error("Journal error: %s", e)
+
+    def rotate(self) -> int:
+        """Sync the journal and continue it in a new segment.
+
+        Returns:
+            int: Seq of the last record in the finished segments.
+        """
+        with self._io, self._cond:
+            data, self._buffer = self._buffer, bytearray()
+            self._file.write(data)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = self._open_segment()
+            return self.seq
+
+    def discard_until(self, seq: int) -> None:
+        """Delete the finished segments holding no record after a seq."""
+        found = segments(self.path)
+        for (_, name), (start, _) in zip(found, found[1:]):
+            if start <= seq + 1 and name != self._file.name:
+                os.remove(name)
+
+    def close(self) -> None:
+        """Write out the buffered records and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.sync()
+        self._file.close()
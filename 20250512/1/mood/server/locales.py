@@ -0,0 +1,118 @@
+"""Message catalogs of the MOOD server.
+
+Locales are discovered from the compiled catalogs under ``locale/`` next to
+this module (``<locale>/LC_MESSAGES/messages.mo``) the first time anyone
+asks, and each catalog is loaded the first time its locale is used. Loaded
+catalogs are shared by every Game in the process.
+
+A catalog is flattened into plain dicts: one from message id to text and
+one from plural message id to the tuple of its plural forms, and the plural
+form index of every count below PRERESOLVED_COUNTS is computed up front.
+Translating a message is then a dict lookup however many locales there are.
+"""
+import gettext
+import logging
+import os
+import threading
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+LOCALE_DIR = os.path.join(os.path.dirname(__file__), "locale")
+DOMAIN = "messages"
+DEFAULT_LOCALE = "en_US"
+PRERESOLVED_COUNTS = 1000
+NULL_TRANSLATIONS = gettext.NullTranslations()
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_available: Optional[FrozenSet[str]] = None
+_catalogs: Dict[str, gettext.NullTranslations] = {}
+
+
+class Catalog(gettext.NullTranslations):
+    """Translations of one locale held in plain dicts.
+
+    Untranslated messages fall back to the message id, as with gettext.
+    """
+
+    def __init__(self, translations: gettext.GNUTranslations):
+        """Flatten a loaded gettext catalog.
+
+        Args:
+            translations (gettext.GNUTranslations): The catalog to flatten.
+        """
+        super().__init__()
+        self._info = translations.info()
+        self._charset = translations.charset()
+        self._messages: Dict[str, str] = {}
+        forms: Dict[str, Dict[int, str]] = {}
+        for key, text in translations._catalog.items():
+            if isinstance(key, tuple):
+                forms.setdefault(key[0], {})[key[1]] = text
+            elif key:
+                self._messages[key] = text
+        self._plurals: Dict[str, Tuple[str, ...]] = {
+            msgid: tuple(texts[i] for i in sorted(texts))
+            for msgid, texts in forms.items()}
+        self._plural: Callable[[int], int] = translations.plural
+        self._indices = [self._plural(n) for n in range(PRERESOLVED_COUNTS)]
+
+    def gettext(self, message: str) -> str:
+        """Translate a message."""
+        return self._messages.get(message, message)
+
+    def ngettext(self, msgid1: str, msgid2: str, n: int) -> str:
+        """Translate a message with plural forms for a count."""
+        forms = self._plurals.get(msgid1)
+        if forms is None:
+            return msgid1 if n == 1 else msgid2
+        index = (self._indices[n] if 0 <= n < PRERESOLVED_COUNTS
+                 else self._plural(n))
+        return forms[index] if index < len(forms) else msgid2
+
+
+def available_locales() -> FrozenSet[str]:
+    """Get the names of the locales with a catalog, and DEFAULT_LOCALE."""
+    global _available
+    if _available is None:
+        try:
+            names = os.listdir(LOCALE_DIR)
+        except OSError:
+            names = []
+        _available = frozenset(
+            [DEFAULT_LOCALE] + [name for name in names if os.path.isfile(
+                os.path.join(LOCALE_DIR, name, "LC_MESSAGES", f"{DOMAIN}.mo"))])
+    return _available
+
+
+def translation(locale: str) -> gettext.NullTranslations:
+    """Get the shared catalog of a locale, loading it on first use.
+
+    Returns:
+        gettext.NullTranslations: The catalog, or NULL_TRANSLATIONS for
+            DEFAULT_LOCALE and unknown or broken locales.
+    """
+    catalog = _catalogs.get(locale)
+    if catalog is not None:
+        return catalog
+    if locale not in available_locales():
+        return NULL_TRANSLATIONS
+    with _lock:
+        catalog = _catalogs.get(locale)
+        if catalog is None:
+            catalog = _catalogs[locale] = _load(locale)
+    return catalog
+
+
+def _load(locale: str) -> gettext.NullTranslations:
+    if locale == DEFAULT_LOCALE:
+        return NULL_TRANSLATIONS
+    path = os.path.join(LOCALE_DIR, locale, "LC_MESSAGES", f"{DOMAIN}.mo")
+    try:
+        with open(path, "rb") as f:
+            catalog = Catalog(gettext.GNUTranslations(f))
+    except (OSError, ValueError) as e:
+        log.warning("Could not load translations for %s: %s", locale, e)
+        return NULL_TRANSLATIONS
+    log.debug("Loaded translations for %s from %s", locale, path)
+    return catalog
@@ -0,0 +1,113 @@
+"""Logging setup of the MOOD server.
+
+Server modules log through the standard logging module, to loggers under
+``mood.server``; per-call details on hot paths (translations, commands,
+connections) are logged at DEBUG level and cost one level check while
+it is disabled. setup_logging() sends the records to a queue drained by a
+background thread, so the game never waits for the output stream, and can
+keep only a fraction of the DEBUG and INFO records of chosen categories.
+"""
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Dict, Optional, TextIO
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+ROOT = "mood.server"
+
+
+def category_logger(category: str) -> str:
+    """Get the logger name of a category like ``connections``."""
+    return category if category.startswith(ROOT) else f"{ROOT}.{category}"
+
+
+def parse_sample(text: str) -> Dict[str, float]:
+    """Parse sampling rates like ``translations=0.01,connections=0.5``.
+
+    Raises:
+        ValueError: If a rate is not between 0 and 1.
+    """
+    rates = {}
+    for part in text.split(","):
+        category, _, rate = part.partition("=")
+        value = float(rate)
+        if not 0 <= value <= 1:
+            raise ValueError(f"Sampling rate must be between 0 and 1, got {rate}")
+        rates[category_logger(category.strip())] = value
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fixed fraction of the DEBUG and INFO records of each logger.
+
+    The rate of a logger is that of its nearest configured ancestor, 1 by
+    default. Records are kept evenly (every second one at 0.5) rather than
+    at random, and warnings and errors are always kept.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        """Initialize the filter.
+
+        Args:
+            rates (dict): Logger name to the fraction of records to keep.
+        """
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+        self._credit: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            prefix, rate = name, 1.0
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether to keep a record."""
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1:
+            return True
+        credit = self._credit.get(record.name, 0.0) + rate
+        keep = credit >= 1
+        self._credit[record.name] = credit - 1 if keep else credit
+        return keep
+
+
+def setup_logging(level: str = "INFO",
+                  rates: Optional[Dict[str, float]] = None,
+                  stream: TextIO = sys.stderr
+                  ) -> logging.handlers.QueueListener:
+    """Send the server's log records to a stream through a writer thread.
+
+    Args:
+        level (str): Lowest level logged, one of LEVELS.
+        rates (dict): Logger name to the fraction of its DEBUG and INFO
+            records to keep.
+        stream: Stream to write the records to.
+
+    Returns:
+        logging.handlers.QueueListener: The running writer; stop() it to
+            write out the remaining records.
+    """
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(records)
+    handler.addFilter(SamplingFilter(rates or {}))
+    output = logging.StreamHandler(stream)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = logging.handlers.QueueListener(records, output)
+    listener.start()
+    logger = logging.getLogger(ROOT)
+    logger.handlers[:] = [handler]
+    logger.setLevel(level)
+    logger.propagate = False
+    return listener
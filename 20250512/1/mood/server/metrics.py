@@ -0,0 +1,285 @@
+"""In-process metrics of the MOOD server.
+
+The game records the handling time of every client command, keyed by its
+COMMANDS name, and the time spent fanning each broadcast out to its
+recipients. Both go into fixed-bucket histograms, so recording costs a
+bisect and two additions and nothing is allocated per sample. Everything
+else (players, monsters, outbox queues, scheduler ticks) is read only when
+somebody asks: through the ``stats`` command or a scrape of the HTTP
+endpoint, which serves the Prometheus text format on ``/metrics``.
+"""
+import bisect
+import heapq
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEEPEST_QUEUES = 10
+
+
+class Histogram:
+    """Counts of observed values in fixed buckets.
+
+    Attributes:
+        buckets (tuple): Upper bounds of the buckets, ascending; values
+            above the last one fall into an implicit +Inf bucket.
+        counts (list): Number of values in each bucket, not cumulative.
+        count (int): Number of values observed.
+        sum (float): Sum of the values observed.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """Initialize an empty histogram."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket holding it.
+
+        Returns:
+            float: The bound, inf if it lies in the last bucket, or 0.0 if
+                nothing was observed.
+        """
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Histograms and counters recorded by a game.
+
+    Updates go through the record methods, which hold a lock: a
+    StripedGame records from many client threads at once, and rate-limited
+    commands are counted on the connection threads of any game.
+
+    Attributes:
+        commands (dict): Handling time histogram per command name.
+        fanout (Histogram): Time spent delivering each broadcast.
+        recipients (int): Number of frames queued by broadcasts.
+        throttled (int): Number of commands over a client's rate limit.
+        scheduler (Scheduler): Scheduler whose tick statistics are
+            reported, or None.
+    """
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self.commands: Dict[str, Histogram] = {}
+        self.fanout = Histogram()
+        self.recipients = 0
+        self.throttled = 0
+        self.scheduler = None
+        self.lock = threading.Lock()
+
+    def command(self, name: str) -> Histogram:
+        """Get the histogram of a command, creating it on first use."""
+        histogram = self.commands.get(name)
+        if histogram is None:
+            histogram = self.commands[name] = Histogram()
+        return histogram
+
+    def record_command(self, name: str, seconds: float) -> None:
+        """Record the handling time of a command."""
+        with self.lock:
+            self.command(name).observe(seconds)
+
+    def record_fanout(self, seconds: float, recipients: int) -> None:
+        """Record the delivery of a broadcast."""
+        with self.lock:
+            self.fanout.observe(seconds)
+            self.recipients += recipients
+
+    def record_throttled(self) -> None:
+        """Count a command over a client's rate limit."""
+        with self.lock:
+            self.throttled += 1
+
+
+def collect(game) -> Dict:
+    """Gather the current metrics of a game.
+
+    Must run on the owner of the game, so the state is consistent. Only the
+    DEEPEST_QUEUES fullest outboxes are listed by player, so the result
+    fits in one frame however many players are connected; the depth of
+    every outbox is served by the Prometheus endpoint.
+
+    Returns:
+        dict: JSON-serializable metrics; latencies are in milliseconds.
+    """
+    with game.metrics.lock:
+        return _collect(game)
+
+
+def _collect(game) -> Dict:
+    metrics = game.metrics
+    depths = game.queue_depths()
+    stats = {
+        "players": len(depths),
+        "monsters": len(game.field),
+        "queued_frames": sum(depths.values()),
+        "max_queue_depth": max(depths.values(), default=0),
+        "deepest_queues": dict(heapq.nlargest(
+            DEEPEST_QUEUES, depths.items(), key=lambda item: item[1])),
+        "dropped_frames": sum(entry[0].dropped for _, entry in game.roster),
+        "throttled_commands": metrics.throttled,
+        "commands": {name: _summary(histogram)
+                     for name, histogram in sorted(metrics.commands.items())},
+        "fanout": dict(_summary(metrics.fanout), recipients=metrics.recipients),
+    }
+    if metrics.scheduler is not None:
+        stats["scheduler"] = metrics.scheduler.stats()
+    return stats
+
+
+def _summary(histogram: Histogram) -> Dict:
+    return {"count": histogram.count,
+            "mean_ms": histogram.sum / histogram.count * 1000
+            if histogram.count else 0.0,
+            "p50_ms": histogram.quantile(0.5) * 1000,
+            "p99_ms": histogram.quantile(0.99) * 1000}
+
+
+def render_prometheus(game) -> str:
+    """Render the metrics of a game in the Prometheus text format.
+
+    Must run on the owner of the game, so the state is consistent.
+    """
+    with game.metrics.lock:
+        return _render_prometheus(game)
+
+
+def _render_prometheus(game) -> str:
+    stats = _collect(game)
+    metrics = game.metrics
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def histogram(name: str, h: Histogram, labels: str = "") -> None:
+        cumulative = 0
+        for bound, count in zip(h.buckets + (float("inf"),), h.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels}le="{le}"}} {cumulative}')
+        labels = labels.rstrip(",")
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {h.sum!r}")
+        lines.append(f"{name}_count{suffix} {h.count}")
+
+    metric("mood_command_seconds", "histogram",
+           "Time spent handling client commands.")
+    for name, h in sorted(metrics.commands.items()):
+        histogram("mood_command_seconds", h, f'command="{name}",')
+    metric("mood_fanout_seconds", "histogram",
+           "Time spent delivering a broadcast to its recipients.")
+    histogram("mood_fanout_seconds", metrics.fanout)
+    for name, kind, key, help_text in (
+            ("mood_fanout_frames_total", "counter", None,
+             "Frames queued by broadcasts."),
+            ("mood_players", "gauge", "players", "Connected players."),
+            ("mood_monsters", "gauge", "monsters", "Monsters in the world."),
+            ("mood_queued_frames", "gauge", "queued_frames",
+             "Frames waiting in all outboxes."),
+            ("mood_max_queue_depth", "gauge", "max_queue_depth",
+             "Frames waiting in the fullest outbox."),
+            ("mood_dropped_frames", "gauge", "dropped_frames",
+             "Low-priority frames dropped by the connected players' outboxes."),
+            ("mood_throttled_commands_total", "counter", "throttled_commands",
+             "Commands over a client's rate limit.")):
+        metric(name, kind, help_text)
+        lines.append(f"{name} {metrics.recipients if key is None else stats[key]}")
+    metric("mood_queue_depth", "gauge", "Frames waiting in a player's outbox.")
+    for username, depth in sorted(game.queue_depths().items()):
+        lines.append(f'mood_queue_depth{{player="{_label(username)}"}} {depth}')
+    scheduler = stats.get("scheduler")
+    if scheduler is not None:
+        for name, kind, key, help_text in (
+                ("mood_ticks_total", "counter", "ticks", "Scheduler ticks run."),
+                ("mood_tick_overruns_total", "counter", "overruns",
+                 "Ticks which ran past the next deadline."),
+                ("mood_ticks_skipped_total", "counter", "skipped",
+                 "Ticks skipped to catch up after overruns."),
+                ("mood_tick_max_seconds", "gauge", "max_tick_duration",
+                 "Longest tick so far.")):
+            metric(name, kind, help_text)
+            lines.append(f"{name} {scheduler[key]!r}")
+    return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return (value.replace("\\", "\\\\").replace('"', '\\"')
+            .replace("\n", "\\n"))
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Request handler of MetricsServer."""
+
+    def do_GET(self) -> None:
+        """Serve the metrics on /metrics."""
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        actor = self.server.actor
+        body = actor.call(render_prometheus, actor.game).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Do not log every scrape."""
+
+
+class MetricsServer:
+    """HTTP endpoint serving the metrics of a game on ``/metrics``.
+
+    Every scrape renders the metrics through the game's actor, so it never
+    races with the game and costs nothing while nobody scrapes.
+    """
+
+    def __init__(self, actor, host: str = "localhost", port: int = 9100):
+        """Bind the endpoint.
+
+        Args:
+            actor (GameActor): Actor owning the game.
+            host (str): Address to bind to; keep it local, there is no
+                authentication.
+            port (int): Port to listen on, 0 for any free port.
+        """
+        self.httpd = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.actor = actor
+        self.port = self.httpd.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    def start_thread(self) -> threading.Thread:
+        """Serve scrapes from a daemon thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+        self.httpd.server_close()
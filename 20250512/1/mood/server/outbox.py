@@ -0,0 +1,250 @@
+"""Per-connection outbound queues of the MOOD server.
+
+Every connected player owns an outbox: a bounded queue of encoded frames
+drained by a writer of its own, so a client with a full TCP window only
+fills its own queue and never stalls the game or other players.
+"""
+import asyncio
+import socket
+import threading
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional
+
+OVERFLOW_POLICIES = ("drop", "coalesce", "disconnect")
+DEFAULT_QUEUE_SIZE = 256
+
+
+class Outbox:
+    """Bounded queue of frames waiting to be written to one client.
+
+    Frames sent with a key are low-priority broadcasts which may be dropped
+    or coalesced on overflow; frames without a key (responses, chat,
+    join/leave messages) are never dropped.
+
+    Attributes:
+        maxsize (int): Maximum number of queued frames.
+        policy (str): What to do when the queue is full: "drop" drops
+            low-priority frames, "coalesce" replaces a queued low-priority
+            frame with the same key and otherwise drops, "disconnect"
+            closes the connection.
+        dropped (int): Number of low-priority frames dropped so far.
+        coalesced (int): Number of frames merged into a queued one so far.
+        closed (bool): Whether the connection was closed.
+        autoflush (bool): Whether the writer is woken up for every frame.
+            When False, frames wait for flush(), so everything queued
+            during a server tick goes out in a single write.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = "drop",
+                 autoflush: bool = True):
+        """Initialize an empty outbox.
+
+        Args:
+            maxsize (int): Maximum number of queued frames.
+            policy (str): Overflow policy, one of OVERFLOW_POLICIES.
+            autoflush (bool): Whether to write frames as soon as they are sent.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self.autoflush = autoflush
+        self._queue: Deque[List] = deque()
+        self._latest: Dict[Hashable, List] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of frames waiting to be written."""
+        return len(self._queue)
+
+    def send(self, data: bytes, key: Optional[Hashable] = None) -> bool:
+        """Queue an encoded frame for the client.
+
+        Args:
+            data (bytes): The encoded frame.
+            key (Hashable): Coalescing key of a low-priority frame,
+                None for frames which must be delivered.
+
+        Returns:
+            bool: True if the frame was queued or coalesced.
+        """
+        if self.closed:
+            return False
+        queued = self._enqueue(data, key)
+        if queued and self.autoflush:
+            self._wakeup()
+        return queued
+
+    def flush(self) -> None:
+        """Wake the writer up to write all queued frames at once."""
+        if self._queue and not self.closed:
+            self._wakeup()
+
+    def _enqueue(self, data: bytes, key: Optional[Hashable]) -> bool:
+        """Apply the overflow policy and queue a frame."""
+        if len(self._queue) >= self.maxsize:
+            if self.policy == "disconnect":
+                self.close()
+                return False
+            entry = self._latest.get(key) if key is not None else None
+            if self.policy == "coalesce" and entry is not None:
+                entry[0] = data
+                self.coalesced += 1
+                return True
+            if key is not None:
+                self.dropped += 1
+                return False
+            if not self._drop_oldest_low_priority():
+                self.close()
+                return False
+        entry = [data, key]
+        self._queue.append(entry)
+        if key is not None:
+            self._latest[key] = entry
+        return True
+
+    def _drop_oldest_low_priority(self) -> bool:
+        """Make room by dropping the oldest low-priority frame."""
+        for entry in self._queue:
+            if entry[1] is not None:
+                self._queue.remove(entry)
+                if self._latest.get(entry[1]) is entry:
+                    del self._latest[entry[1]]
+                self.dropped += 1
+                return True
+        return False
+
+    def _take_all(self) -> bytes:
+        """Remove all queued frames and return them joined together."""
+        data = b"".join(entry[0] for entry in self._queue)
+        self._queue.clear()
+        self._latest.clear()
+        return data
+
+    def _wakeup(self) -> None:
+        """Wake the writer up after a frame was queued."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Close the connection; queued frames are discarded."""
+        self.closed = True
+
+
+class NullOutbox(Outbox):
+    """Outbox discarding every frame, for players with no connection."""
+
+    def _wakeup(self) -> None:
+        self._take_all()
+
+
+class StreamOutbox(Outbox):
+    """Outbox drained by an asyncio task writing to a StreamWriter.
+
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter,
+                 maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = "drop",
+                 autoflush: bool = True):
+        """Initialize the outbox and start its writer task.
+
+        Args:
+            writer (asyncio.StreamWriter): The client stream.
+            maxsize (int): Maximum number of queued frames.
+            policy (str): Overflow policy, one of OVERFLOW_POLICIES.
+            autoflush (bool): Whether to write frames as soon as they are sent.
+        """
+        super().__init__(maxsize, policy, autoflush)
+        self.writer = writer
+        self._ready = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def _wakeup(self) -> None:
+        self._ready.set()
+
+    async def _run(self) -> None:
+        """Write queued frames until the connection is closed."""
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                data = self._take_all()
+                if data:
+                    self.writer.write(data)
+                    await self.writer.drain()
+        except (ConnectionError, OSError):
+            self.close()
+
+    def close(self) -> None:
+        """Close the connection and stop the writer task."""
+        if self.closed:
+            return
+        super().close()
+        self._task.cancel()
+        self.writer.close()
+
+
+class SocketOutbox(Outbox):
+    """Outbox drained by a thread writing to a blocking socket."""
+
+    def __init__(self, sock: socket.socket,
+                 maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = "drop",
+                 autoflush: bool = True):
+        """Initialize the outbox and start its writer thread.
+
+        Args:
+            sock (socket.socket): The client socket.
+            maxsize (int): Maximum number of queued frames.
+            policy (str): Overflow policy, one of OVERFLOW_POLICIES.
+            autoflush (bool): Whether to write frames as soon as they are sent.
+        """
+        super().__init__(maxsize, policy, autoflush)
+        self.sock = sock
+        self._cond = threading.Condition(threading.RLock())
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def send(self, data: bytes, key: Optional[Hashable] = None) -> bool:
+        """Queue an encoded frame for the client; safe from any thread."""
+        with self._cond:
+            return super().send(data, key)
+
+    def flush(self) -> None:
+        """Wake the writer thread up to write all queued frames at once."""
+        with self._cond:
+            super().flush()
+
+    def _wakeup(self) -> None:
+        self._cond.notify()
+
+    def _run(self) -> None:
+        """Write queued frames until the connection is closed."""
+        while True:
+            with self._cond:
+                while not self._queue and not self.closed:
+                    self._cond.wait()
+                if self.closed:
+                    return
+                data = self._take_all()
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                self.close()
+                return
+
+    def close(self) -> None:
+        """Close the connection and stop the writer thread."""
+        with self._cond:
+            if self.closed:
+                return
+            super().close()
+            self._cond.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
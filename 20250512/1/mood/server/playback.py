@@ -0,0 +1,158 @@
+"""Offline playback of recorded MOOD sessions.
+
+Applies a recording made with ``mood-server --record PATH`` to a fresh Game
+as fast as possible, without sockets, timers or threads. The game is seeded
+with the recorded seed and its clock follows the recorded timestamps, so
+every playback of a recording produces the same frames for every player.
+They are collected into a transcript of player name, tab and frame lines,
+whose SHA-256 digest identifies the outcome of the session: compare the
+digests of two builds to check that a change does not alter behaviour,
+or the timings to measure its speed on real traffic.
+
+Commands are recorded before they run, so a recording of an incident may
+hold a command whose handler raised and dropped its player. Playback
+collects such errors in the result and goes on, like the live server did.
+
+Usage::
+
+    python -m mood.server.playback session.rec [--transcript out.txt]
+"""
+import argparse
+import hashlib
+import os
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+from .outbox import Outbox
+from .recorder import read_recording
+from .server import Game, dispatch, enter, leave, reply
+from .snapshot import restore
+
+
+class ReplayClock:
+    """Clock of a played back game, set to the time of each event."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the time of the event being played back."""
+        return self.now
+
+
+class TranscriptOutbox(Outbox):
+    """Outbox appending every frame of a player to a transcript."""
+
+    def __init__(self, user: str, transcript: List[Tuple[str, bytes]]):
+        """Initialize the outbox of a player.
+
+        Args:
+            user (str): Name of the player.
+            transcript (list): List to append (player, frame) pairs to.
+        """
+        super().__init__()
+        self.user = user
+        self.transcript = transcript
+
+    def _wakeup(self) -> None:
+        data = self._take_all()
+        if data:
+            self.transcript.append((self.user, data))
+
+
+class PlaybackResult(NamedTuple):
+    """Outcome of playing back a recording.
+
+    Attributes:
+        events (int): Number of events applied.
+        seconds (float): Time spent applying them.
+        transcript (list): (player, frame bytes) pairs in the order sent.
+        digest (str): SHA-256 hex digest of the transcript.
+        errors (list): (event number, player, error) of the commands whose
+            handler raised.
+    """
+
+    events: int
+    seconds: float
+    transcript: List[Tuple[str, bytes]]
+    digest: str
+    errors: List[Tuple[int, str, str]]
+
+
+def dump(transcript: List[Tuple[str, bytes]]) -> bytes:
+    """Join a transcript into lines of player name, tab and frame."""
+    return b"".join(user.encode() + b"\t" + data for user, data in transcript)
+
+
+def play(path: str) -> PlaybackResult:
+    """Play back a recorded session against a fresh Game.
+
+    Args:
+        path (str): Recording file.
+
+    Returns:
+        PlaybackResult: The frames sent to the players.
+
+    Raises:
+        ValueError: If the file is not a recording.
+    """
+    header, events = read_recording(path)
+    clock = ReplayClock()
+    game = Game(view_radius=header["view_radius"], width=header["width"],
+                height=header["height"], vectorized=header["vectorized"],
+                seed=header["seed"], clock=clock)
+    game.moving_monsters = header["moving_monsters"]
+    if header["snapshot"] is not None:
+        restore(game, os.path.join(os.path.dirname(path), header["snapshot"]))
+    transcript: List[Tuple[str, bytes]] = []
+    outboxes = {}
+    errors: List[Tuple[int, str, str]] = []
+    count = 0
+    start = time.perf_counter()
+    for event in events:
+        clock.now = event["t"]
+        op, user = event["op"], event.get("user")
+        if op == "cmd":
+            try:
+                res = dispatch(game, user, event["cmd"])
+            except Exception as e:
+                # The live handler dropped the connection; the leave event
+                # it recorded follows.
+                errors.append((count + 1, user, repr(e)))
+            else:
+                outboxes[user].send(reply(event["cmd"], res))
+        elif op == "monsters":
+            game.move_random_monster()
+        elif op == "join":
+            outboxes[user] = TranscriptOutbox(user, transcript)
+            enter(game, user, outboxes[user])
+        elif op == "leave":
+            leave(game, user)
+        count += 1
+    seconds = time.perf_counter() - start
+    digest = hashlib.sha256(dump(transcript)).hexdigest()
+    return PlaybackResult(count, seconds, transcript, digest, errors)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Play back a recording given on the command line."""
+    parser = argparse.ArgumentParser(description="Play back a MOOD session")
+    parser.add_argument("recording", help="Recording made with --record")
+    parser.add_argument("--transcript", default=None, metavar="PATH",
+                        help="Write the frames sent to the players to PATH")
+    args = parser.parse_args(argv)
+    result = play(args.recording)
+    if args.transcript is not None:
+        with open(args.transcript, "wb") as f:
+            f.write(dump(result.transcript))
+    rate = result.events / result.seconds if result.seconds else float("inf")
+    print(f"{result.events} events in {result.seconds:.3f} s "
+          f"({rate:.0f} events/s), {len(result.transcript)} frames")
+    print(f"sha256 {result.digest}")
+    for number, user, error in result.errors:
+        print(f"event {number}: command of {user} failed: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Per-connection rate limiting of client commands.
+
+Every connection gets a RateLimiter holding one token bucket per command
+type. A bucket refills at a steady rate up to its burst size and every
+command takes one token, so a client may send a burst of commands at once
+but not more than the rate on average. The limiter belongs to the
+connection handler and is checked before the command reaches the game, so
+an excess command costs a few arithmetic operations and takes no lock.
+
+What happens to an excess command depends on the policy: "defer" holds
+the connection until a token is available, which also stops reading from
+the client, and "reject" answers with an error right away.
+"""
+import time
+from typing import Dict, Tuple
+
+Limit = Tuple[float, float]
+RATE_POLICIES = ("defer", "reject")
+DEFAULT_LIMITS: Dict[str, Limit] = {"default": (20.0, 40.0)}
+
+
+def parse_limits(text: str) -> Dict[str, Limit]:
+    """Parse limits like ``default=20/40,sayall=1/5``.
+
+    Each entry is a command type, or ``default`` for the others, followed
+    by the rate in commands per second and the burst size.
+
+    Raises:
+        ValueError: If an entry is malformed or a number is not positive.
+    """
+    limits = {}
+    for part in text.split(","):
+        name, _, spec = part.partition("=")
+        rate, _, burst = spec.partition("/")
+        limit = (float(rate), float(burst or rate))
+        if min(limit) <= 0:
+            raise ValueError(f"Rate and burst of {name} must be positive")
+        limits[name.strip()] = limit
+    return limits
+
+
+class TokenBucket:
+    """Token bucket refilled at a steady rate.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (float): Maximum number of tokens.
+        tokens (float): Tokens available at the last update.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "_updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        """Initialize a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            burst (float): Maximum number of tokens.
+            now (float): Current monotonic time.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = now
+
+    def take(self, now: float, reserve: bool = False) -> float:
+        """Take a token if one is available.
+
+        Args:
+            now (float): Current monotonic time.
+            reserve (bool): Take the token even if it is not available yet,
+                leaving the bucket in debt until it refills.
+
+        Returns:
+            float: 0.0 if a token was available, otherwise the seconds until
+                one will be.
+        """
+        tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if tokens >= 1:
+            self.tokens = tokens - 1
+            return 0.0
+        self.tokens = tokens - 1 if reserve else tokens
+        return (1 - tokens) / self.rate
+
+
+class RateLimiter:
+    """Token buckets of one connection, one per command type.
+
+    Attributes:
+        limits (dict): Command type to (rate, burst); the ``default`` entry
+            applies to the other types, which are not limited without it.
+        limited (int): Number of commands over the limit so far.
+    """
+
+    def __init__(self, limits: Dict[str, Limit], clock=time.monotonic):
+        """Initialize a limiter with full buckets.
+
+        Args:
+            limits (dict): Command type to (rate, burst).
+            clock (callable): Source of the monotonic time.
+        """
+        self.limits = limits
+        self.limited = 0
+        self._clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def check(self, kind: str, reserve: bool = False) -> float:
+        """Count a command against the limits.
+
+        Args:
+            kind (str): Type of the command, as sent by the client.
+            reserve (bool): Count the command even if it is over the limit,
+                because it will run after the returned wait.
+
+        Returns:
+            float: 0.0 if the command may run now, otherwise the seconds to
+                wait until it may run.
+        """
+        # Other types share the default bucket, so junk types cannot open
+        # an unlimited number of buckets.
+        key = kind if isinstance(kind, str) and kind in self.limits else "default"
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit = self.limits.get(key)
+            if limit is None:
+                return 0.0
+            bucket = self._buckets[key] = TokenBucket(*limit, self._clock())
+        wait = bucket.take(self._clock(), reserve)
+        if wait:
+            self.limited += 1
+        return wait
@@ -0,0 +1,128 @@
+"""Session recordings of the MOOD server.
+
+A recording holds everything needed to run a session again without
+sockets: the seed of the game's random generators and the exact stream of
+joins, leaves, client commands and monster moves in the order the game
+applied them, each with the player's name and the game uptime. It is a
+JSON lines file::
+
+    {"version": 2, "seed": ..., "width": ..., "height": ..., ...}
+    {"t": 0.512, "op": "join", "user": "alice"}
+    {"t": 0.730, "op": "cmd", "user": "alice", "cmd": {"type": "move", ...}}
+    {"t": 30.001, "op": "monsters"}
+    {"t": 41.200, "op": "leave", "user": "alice"}
+
+If the game did not start empty, its state is saved next to the recording
+as a snapshot named in the header. mood.server.playback applies a
+recording to a fresh Game as fast as possible.
+"""
+import json
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+RECORDING_VERSION = 2
+RECORDED_OPS = ("join", "leave", "cmd", "monsters")
+
+
+class Recorder:
+    """Writes the events applied to a game to a recording.
+
+    Events are buffered and written out by flush(), which the server calls
+    once per tick.
+
+    Attributes:
+        path (str): Recording file.
+        events (int): Number of events recorded so far.
+    """
+
+    def __init__(self, path: str, game, snapshot: Optional[str] = None):
+        """Create the recording and write its header.
+
+        Args:
+            path (str): Recording file.
+            game (Game): The recorded game; its seed and options go to the
+                header and its uptime timestamps the events.
+            snapshot (str): Snapshot of the state the game starts from, or
+                None if it starts empty.
+        """
+        self.path = path
+        self.game = game
+        self.events = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(json.dumps({
+            "version": RECORDING_VERSION,
+            "seed": game.seed,
+            "width": game.field.width,
+            "height": game.field.height,
+            "view_radius": game.interest.radius,
+            "vectorized": game.vectorized,
+            "moving_monsters": game.moving_monsters,
+            "snapshot": snapshot
+        }) + "\n")
+        self._file.flush()
+
+    def record(self, op: str, user: Optional[str] = None,
+               cmd: Optional[Dict] = None) -> None:
+        """Record an event at the current game uptime.
+
+        Must be called by whoever applies the event, right before applying
+        it, so the recording keeps the order of the game.
+
+        Args:
+            op (str): One of RECORDED_OPS.
+            user (str): Name of the player, except for monster moves.
+            cmd (dict): The client command of a "cmd" event.
+        """
+        event = {"t": round(self.game.get_uptime(), 6), "op": op}
+        if user is not None:
+            event["user"] = user
+        if cmd is not None:
+            event["cmd"] = cmd
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.events += 1
+
+    def flush(self) -> None:
+        """Write out the buffered events."""
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Write out the buffered events and close the recording."""
+        with self._lock:
+            self._file.close()
+
+
+def read_recording(path: str) -> Tuple[Dict, Iterator[Dict]]:
+    """Open a recording.
+
+    An event cut short by a crash ends the recording.
+
+    Args:
+        path (str): Recording file.
+
+    Returns:
+        tuple: The header and an iterator over the events.
+
+    Raises:
+        ValueError: If the file is not a recording of a supported version.
+    """
+    f = open(path, "rb")
+    try:
+        header = json.loads(f.readline() or b"null")
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("version") != RECORDING_VERSION:
+        f.close()
+        raise ValueError(f"{path} is not a MOOD session recording")
+
+    def events() -> Iterator[Dict]:
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                yield json.loads(line)
+
+    return header, events()
@@ -0,0 +1,190 @@
+"""Game tick scheduler of the MOOD server.
+
+The scheduler runs a fixed-rate tick loop on an asyncio event loop. Tick
+deadlines are derived from the start time rather than from the end of the
+previous tick, so the loop does not drift; a tick that runs past the next
+deadline is counted as an overrun and the missed ticks are skipped.
+
+Subsystems register callbacks to run on every tick, and one-off or repeating
+timers kept in a heap and fired at tick resolution.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_TICK = 0.05
+
+log = logging.getLogger(__name__)
+
+
+class GameTimer:
+    """Handle of a timer registered with the scheduler.
+
+    Attributes:
+        deadline (float): Loop time when the timer fires next.
+        interval (float): Repeat interval, or None for a one-off timer.
+        cancelled (bool): Whether the timer was cancelled.
+    """
+
+    def __init__(self, deadline: float, interval: Optional[float],
+                 callback: Callable, args: Tuple):
+        """Initialize a timer.
+
+        Args:
+            deadline (float): Loop time of the first run.
+            interval (float): Repeat interval, or None.
+            callback (callable): Function to call.
+            args (tuple): Arguments for the callback.
+        """
+        self.deadline = deadline
+        self.interval = interval
+        self.cancelled = False
+        self._callback = callback
+        self._args = args
+
+    def cancel(self) -> None:
+        """Stop the timer; it will not fire again."""
+        self.cancelled = True
+
+
+class Scheduler:
+    """Fixed-rate tick loop with tick callbacks and timers.
+
+    Attributes:
+        tick (float): Tick duration in seconds.
+        ticks (int): Number of ticks run so far.
+        overruns (int): Number of ticks which ran past the next deadline.
+        skipped (int): Number of ticks skipped to catch up after overruns.
+        last_tick_duration (float): Time spent in the last tick, seconds.
+        max_tick_duration (float): Longest tick so far, seconds.
+    """
+
+    def __init__(self, tick: float = DEFAULT_TICK):
+        """Initialize an idle scheduler.
+
+        Args:
+            tick (float): Tick duration in seconds.
+        """
+        self.tick = tick
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.last_tick_duration = 0.0
+        self.max_tick_duration = 0.0
+        self._tick_callbacks: List[Callable[[], None]] = []
+        self._timers: List[Tuple[float, int, GameTimer]] = []
+        self._seq = itertools.count()
+        self._now = 0.0
+        self._stopped = False
+
+    def on_tick(self, callback: Callable[[], None]) -> None:
+        """Register a callback to run at the end of every tick."""
+        self._tick_callbacks.append(callback)
+
+    def call_later(self, delay: float, callback: Callable, *args) -> GameTimer:
+        """Run a callback once after a delay.
+
+        Args:
+            delay (float): Delay in seconds.
+            callback (callable): Function to call.
+            *args: Arguments for the callback.
+
+        Returns:
+            GameTimer: Handle which can cancel the timer.
+        """
+        return self._add(GameTimer(self._now + delay, None, callback, args))
+
+    def call_every(self, interval: float, callback: Callable, *args) -> GameTimer:
+        """Run a callback every interval seconds, first after one interval.
+
+        Args:
+            interval (float): Repeat interval in seconds.
+            callback (callable): Function to call.
+            *args: Arguments for the callback.
+
+        Returns:
+            GameTimer: Handle which can cancel the timer.
+        """
+        return self._add(GameTimer(self._now + interval, interval, callback, args))
+
+    def _add(self, timer: GameTimer) -> GameTimer:
+        heapq.heappush(self._timers, (timer.deadline, next(self._seq), timer))
+        return timer
+
+    def stats(self) -> Dict[str, float]:
+        """Get the scheduler metrics."""
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "last_tick_duration": self.last_tick_duration,
+            "max_tick_duration": self.max_tick_duration,
+        }
+
+    def run_tick(self, now: float) -> None:
+        """Fire due timers, then the tick callbacks.
+
+        Args:
+            now (float): Current loop time.
+        """
+        self._now = now
+        while self._timers and self._timers[0][0] <= now:
+            _, _, timer = heapq.heappop(self._timers)
+            if timer.cancelled:
+                continue
+            if timer.interval is not None:
+                timer.deadline += timer.interval
+                if timer.deadline <= now:
+                    timer.deadline = now + timer.interval
+                self._add(timer)
+            self._call(timer._callback, *timer._args)
+        for callback in list(self._tick_callbacks):
+            self._call(callback)
+
+    @staticmethod
+    def _call(callback: Callable, *args) -> None:
+        try:
+            callback(*args)
+        except Exception as e:
+            log.exception("Scheduler callback error: %s", e)
+
+    async def run(self) -> None:
+        """Run the tick loop on the current event loop until stopped."""
+        loop = asyncio.get_running_loop()
+        offset, self._now = loop.time() - self._now, loop.time()
+        for _, _, timer in self._timers:
+            timer.deadline += offset
+        self._timers = [(t.deadline, seq, t) for _, seq, t in self._timers]
+        heapq.heapify(self._timers)
+        next_tick = self._now + self.tick
+        while not self._stopped:
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            started = loop.time()
+            self.run_tick(started)
+            finished = loop.time()
+            self.ticks += 1
+            self.last_tick_duration = finished - started
+            self.max_tick_duration = max(self.max_tick_duration,
+                                         self.last_tick_duration)
+            next_tick += self.tick
+            if finished > next_tick:
+                missed = int((finished - next_tick) // self.tick) + 1
+                self.overruns += 1
+                self.skipped += missed
+                next_tick += missed * self.tick
+
+    def start_thread(self) -> threading.Thread:
+        """Run the tick loop on its own event loop in a daemon thread."""
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),),
+                                  daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """Stop the tick loop after the current tick."""
+        self._stopped = True
@@ -12,96 +12,396 @@ import threading
 import time
 import cowsay
 import gettext
+import logging
 import os
-from typing import Dict, Tuple, Optional
-
-from ..common.models import Monster, Gamer
+from functools import partial
+from typing import Callable, Dict, FrozenSet, Iterable, Tuple, Optional, Union
+
+from ..common.framing import FrameDecoder, encode_frame, read_frame, recv_frame
+from ..common.models import WORLD_HEIGHT, WORLD_WIDTH, Monster, Gamer
+from .actor import GameActor, InlineActor
+from .aoi import DEFAULT_VIEW_RADIUS, InterestGrid
+from .events import Event, coalesce_key, encode_event
+from .scheduler import DEFAULT_TICK, Scheduler
+from .simulation import DIRECTIONS, MonsterSwarm, visible_moves
+from .snapshot import (SNAPSHOT_INTERVAL, Snapshotter, capture, restore,
+                       snapshot_seq, write_snapshot)
+from .world import CellIndex, StripedWorld, World
+from .journal import JOURNALED, Journal, read_journal
+from .locales import DEFAULT_LOCALE, available_locales, translation
+from .metrics import Metrics, MetricsServer, collect
+from .ratelimit import DEFAULT_LIMITS, RATE_POLICIES, Limit, RateLimiter
+from .recorder import Recorder
+from .outbox import (DEFAULT_QUEUE_SIZE, OVERFLOW_POLICIES, NullOutbox, Outbox,
+                     SocketOutbox, StreamOutbox)
+
+Connection = Union[socket.socket, asyncio.StreamWriter]
+PlayerEntry = Tuple[Outbox, Gamer, str]
+
+log = logging.getLogger(__name__)
+connections_log = logging.getLogger("mood.server.connections")
+translations_log = logging.getLogger("mood.server.translations")
+commands_log = logging.getLogger("mood.server.commands")
+
+
+ENGINES = ("asyncio", "threads")
+MONSTER_MOVE_INTERVAL = 30.0
+MONSTER_DIRECTIONS = (
+    ("right", (1, 0)),
+    ("left", (-1, 0)),
+    ("up", (0, -1)),
+    ("down", (0, 1))
+)
 
 
 class Server:
     """MOOD game server implementation."""
-    def __init__(self, host: str = 'localhost', port: int = 12345):
+    def __init__(self, host: str = 'localhost', port: int = 12345,
+                 engine: str = "asyncio", queue_size: int = DEFAULT_QUEUE_SIZE,
+                 overflow: str = "drop", tick: Optional[float] = None,
+                 view_radius: int = DEFAULT_VIEW_RADIUS,
+                 width: int = WORLD_WIDTH, height: int = WORLD_HEIGHT,
+                 vectorized: bool = False, striped: bool = False,
+                 snapshot: Optional[str] = None,
+                 snapshot_interval: float = SNAPSHOT_INTERVAL,
+                 journal: Optional[str] = None, record: Optional[str] = None,
+                 seed: Optional[int] = None, metrics_port: Optional[int] = None,
+                 admins: Iterable[str] = (),
+                 rate_limits: Dict[str, Limit] = DEFAULT_LIMITS,
+                 rate_policy: str = "defer"):
         """Initialize the MOOD game server.
 
         Args:
             host (str): The hostname or IP address
                         to bind the server to (default: 'localhost').
             port (int): The port number to listen on (default: 12345).
+            engine (str): Connection handling engine, either "asyncio"
+                          (one event loop for all clients, default) or
+                          "threads" (one OS thread per client).
+            queue_size (int): Maximum number of frames queued for one client.
+            overflow (str): What to do when a client's queue is full:
+                            "drop", "coalesce" or "disconnect".
+            tick (float): Server tick in seconds. When set, frames produced
+                          during a tick are sent to each client in one write
+                          at the end of the tick; when None (default) they
+                          are written right away and the scheduler ticks
+                          every DEFAULT_TICK seconds.
+            view_radius (int): Distance in cells within which players see
+                               movement of other players and monsters.
+            width (int): World width in cells, up to MAX_WORLD_SIZE.
+            height (int): World height in cells, up to MAX_WORLD_SIZE.
+            vectorized (bool): Keep monsters in NumPy arrays and move all
+                               of them on every tick instead of moving one
+                               monster every MONSTER_MOVE_INTERVAL seconds.
+            striped (bool): Use StripedGame, which guards its state with
+                            fine-grained locks, and let client threads run
+                            commands in parallel instead of through a
+                            single-writer GameActor. Requires the "threads"
+                            engine.
+            snapshot (str): File to restore the world from at startup, if
+                            it exists, and to save snapshots to.
+            snapshot_interval (float): Seconds between snapshots.
+            journal (str): Path prefix of the command journal; commands,
+                           joins, leaves and monster steps journaled after
+                           the snapshot are replayed at startup.
+            record (str): File to record the session to, for replaying it
+                          with mood.server.playback.
+            seed (int): Seed of the monster movement; random by default.
+            metrics_port (int): Port of the local HTTP endpoint serving
+                                metrics in the Prometheus text format.
+            admins (iterable): Players allowed to use the stats command;
+                               nobody if empty.
+            rate_limits (dict): Command type, or "default", to the (rate,
+                                burst) token bucket limiting each client;
+                                empty for no limits.
+            rate_policy (str): What to do with a command over the limit:
+                               "defer" runs it once a token is available,
+                               "reject" answers with an error.
+
+        Raises:
+            ValueError: If the engine, overflow or rate policy is unknown,
+                        the world dimensions are out of range, striped is
+                        set with an engine other than "threads" or
+                        together with vectorized, or the snapshot does not
+                        match the world.
+            RuntimeError: If vectorized is set and numpy is not installed.
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        if striped and engine != "threads":
+            raise ValueError("A striped game requires the threads engine")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if rate_policy not in RATE_POLICIES:
+            raise ValueError(f"Unknown rate policy: {rate_policy}")
         self.host = host
         self.port = port
-        self.game = Game()
+        self.engine = engine
+        self.tick = tick
+        game_class = StripedGame if striped else Game
+        self.game = game_class(queue_size, overflow, batched=tick is not None,
+                               view_radius=view_radius, width=width,
+                               height=height, vectorized=vectorized,
+                               seed=seed)
+        self.game.admins = frozenset(admins)
+        self.game.rate_limits = dict(rate_limits)
+        self.game.rate_policy = rate_policy
+        self.actor = (InlineActor if striped else GameActor)(self.game)
+        self.snapshotter: Optional[Snapshotter] = None
+        self.journal: Optional[Journal] = None
+        self._recover(snapshot, journal)
+        self.recorder: Optional[Recorder] = None
+        if record is not None:
+            self._start_recording(record)
+        self.scheduler = Scheduler(tick or DEFAULT_TICK)
+        self.game.metrics.scheduler = self.scheduler
+        self.metrics_server = (MetricsServer(self.actor, host, metrics_port)
+                               if metrics_port is not None else None)
+        if vectorized:
+            self.scheduler.on_tick(
+                partial(self.actor.post, self.game.move_random_monster))
+        else:
+            self.scheduler.call_every(MONSTER_MOVE_INTERVAL, self.actor.post,
+                                      self.game.move_random_monster)
+        if tick is not None:
+            self.scheduler.on_tick(partial(self.actor.post, self.game.flush_all))
+        if self.snapshotter is not None:
+            self.scheduler.call_every(snapshot_interval, self.actor.post,
+                                      self.snapshotter.start)
+        if self.journal is not None:
+            self.scheduler.on_tick(self.journal.commit)
+        if self.recorder is not None:
+            self.scheduler.on_tick(self.recorder.flush)
         self.sock = None
 
+    def _recover(self, snapshot: Optional[str], journal: Optional[str]) -> None:
+        """Restore the last snapshot and replay the journal after it."""
+        seq = 0
+        if snapshot is not None and os.path.exists(snapshot):
+            count = restore(self.game, snapshot)
+            seq = snapshot_seq(snapshot)
+            log.info("Restored %d monsters from %s", count, snapshot)
+        if journal is not None:
+            seq = max(seq, replay(self.game, read_journal(journal, seq)))
+            log.info("Replayed journal %s up to record %d", journal, seq)
+            self.journal = self.game.journal = Journal(journal, seq)
+        if snapshot is not None:
+            self.snapshotter = Snapshotter(self.game, snapshot, journal=self.journal)
+
+    def _start_recording(self, path: str) -> None:
+        """Record the session, saving the state it starts from if any."""
+        base = None
+        if len(self.game.field) or self.game.saved_positions:
+            write_snapshot(f"{path}.snap", capture(self.game))
+            base = os.path.basename(f"{path}.snap")
+        self.recorder = self.game.recorder = Recorder(path, self.game, base)
+        log.info("Recording the session to %s, seed %d", path, self.game.seed)
+
+    def _start_metrics(self) -> None:
+        """Start serving metrics over HTTP if a metrics port was given."""
+        if self.metrics_server is not None:
+            self.metrics_server.start_thread()
+            log.info("Metrics on http://%s:%d/metrics", self.host,
+                     self.metrics_server.port)
+
+    def _shutdown(self) -> None:
+        """Stop the timers and the actor and close the journal and recording."""
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        self.scheduler.stop()
+        self.actor.stop()
+        if self.journal is not None:
+            self.journal.close()
+        if self.recorder is not None:
+            self.recorder.close()
+
     def start_server(self) -> None:
         """Start the MOOD game server."""
+        if self.engine == "asyncio":
+            try:
+                asyncio.run(self.serve())
+            except Exception as e:
+                log.error("Server error: %s", e)
+            return
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        threading.Thread(target=start_loop, daemon=True).start()
-        threading.Thread(target=schedule_monster_movement,
-                         args=(self.game,), daemon=True).start()
+        self.actor.start_thread()
+        self.scheduler.start_thread()
+        self._start_metrics()
         try:
             self.sock.bind((self.host, self.port))
             self.sock.listen(5)
-            print(f"Server running on {self.host}:{self.port}")
-            accept_connections(self.sock, self.game)
+            log.info("Server running on %s:%d", self.host, self.port)
+            accept_connections(self.sock, self.actor)
         except Exception as e:
-            print(f"Server error: {e}")
+            log.error("Server error: %s", e)
         finally:
+            self._shutdown()
             self.sock.close()
-            loop.call_soon_threadsafe(loop.stop)
+
+    async def serve(self) -> None:
+        """Serve all clients as tasks on the running asyncio event loop."""
+        self.actor.attach(asyncio.get_running_loop())
+        server = await asyncio.start_server(
+            lambda r, w: handle_connection(r, w, self.actor),
+            self.host, self.port
+        )
+        ticker = asyncio.create_task(self.scheduler.run())
+        self._start_metrics()
+        log.info("Server running on %s:%d", self.host, self.port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._shutdown()
+            ticker.cancel()
 
 
 class Game:
-    """Manages the game state for the MOOD server."""
-    def __init__(self):
+    """Manages the game state for the MOOD server.
+
+    A running server changes the game only through its GameActor, so the
+    methods below are never called concurrently and take no locks.
+
+    The player registry is copy-on-write: joining, leaving and changing the
+    locale build a new players dict and roster tuple and swap them in, and
+    neither is ever changed in place. Broadcasts iterate the roster they
+    read without copying it, whatever happens to the registry meanwhile.
+
+    Attributes:
+        players (dict): Username to (outbox, gamer, locale); read-only.
+        roster (tuple): The (username, entry) pairs of players.
+        saved_positions (dict): Positions of players from a restored
+            snapshot, where they reappear when they join again.
+        journal (Journal): Journal of state-changing commands, or None.
+        recorder (Recorder): Recorder of the session, or None.
+        metrics (Metrics): Command and broadcast timings.
+        admins (frozenset): Players allowed to see the stats; none if empty.
+        rate_limits (dict): Per-connection command limits, see RateLimiter.
+        rate_policy (str): "defer" or "reject" commands over the limits.
+        seed (int): Seed of rng and of the vectorized field's generator.
+        rng (random.Random): Random generator drawing the seed of every
+            monster step.
+    """
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 overflow: str = "drop", batched: bool = False,
+                 view_radius: int = DEFAULT_VIEW_RADIUS,
+                 width: int = WORLD_WIDTH, height: int = WORLD_HEIGHT,
+                 vectorized: bool = False, seed: Optional[int] = None,
+                 clock: Callable[[], float] = time.time):
         """Initialize the MOOD game state.
 
         Sets up the game field, player management, and translation support.
+
+        Args:
+            queue_size (int): Maximum number of frames queued for one client.
+            overflow (str): Overflow policy of the client outboxes.
+            batched (bool): Whether client outboxes wait for flush_all()
+                            instead of writing every frame right away.
+            view_radius (int): Radius of the players' area of interest.
+            width (int): World width in cells.
+            height (int): World height in cells.
+            vectorized (bool): Whether to keep monsters in a MonsterSwarm
+                               and move all of them at once.
+            seed (int): Seed of the monster movement; random by default.
+            clock (callable): Source of the current time in seconds.
         """
-        self.field: Dict[Tuple[int, int], Monster] = {}
-        self.players: Dict[str, Tuple[socket.socket, Gamer, str]] = {}
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.clock = clock
+        self.vectorized = vectorized
+        self.field = (MonsterSwarm(width, height, self.seed) if vectorized
+                      else World(width, height))
+        self.players: Dict[str, PlayerEntry] = {}
+        self.saved_positions: Dict[str, Tuple[int, int]] = {}
+        self.journal: Optional[Journal] = None
+        self.recorder: Optional[Recorder] = None
+        self.metrics = Metrics()
+        self.admins: FrozenSet[str] = frozenset()
+        self.rate_limits: Dict[str, Limit] = {}
+        self.rate_policy = "defer"
+        self.roster: Tuple[Tuple[str, PlayerEntry], ...] = ()
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.batched = batched
+        self.interest = InterestGrid(view_radius, width, height)
+        self.cells = CellIndex()
         self.valid_monsters = cowsay.list_cows() + ["jgsbat"]
-        self.start_time = time.time()
+        self.start_time = clock()
         self.moving_monsters = True
-        self.locales: Dict[str, gettext.GNUTranslations] = {}
-        self.load_locales()
-
-    def load_locales(self):
-        """Load available translations."""
-        locale_dir = os.path.join(os.path.dirname(__file__), 'locale')
-        try:
-            ru_trans = gettext.translation('messages',
-                                           locale_dir, languages=['ru_RU'])
-            self.locales['ru_RU'] = ru_trans
-            print(f"Loaded translations for ru_RU from {locale_dir}")
-        except FileNotFoundError as e:
-            print(f"Warning: Could not load translations from {locale_dir}: {e}")
 
     def get_uptime(self) -> float:
         """Calculate server uptime in seconds."""
-        return time.time() - self.start_time
+        return self.clock() - self.start_time
 
-    def add_player(self, username: str, conn: socket.socket) -> bool:
+    def add_player(self, username: str, conn: Outbox) -> bool:
         """Add a player to the game."""
         if username in self.players:
             return False
-        self.players[username] = (conn, Gamer(0, 0), 'en_US')
+        x, y = pos = self.saved_positions.pop(username, (0, 0))
+        gamer = Gamer(x, y, self.field.width, self.field.height,
+                      on_move=partial(self._player_moved, username))
+        self._set_players({**self.players, username: (conn, gamer, DEFAULT_LOCALE)})
+        self.cells.add(username, pos)
+        self.interest.add(username, pos)
         return True
 
     def remove_player(self, username: str) -> bool:
         """Remove a player from the game."""
-        return self.players.pop(username, None) is not None
+        entry = self.players.get(username)
+        if entry is None:
+            return False
+        self._set_players({name: other for name, other in self.roster
+                           if name != username})
+        self.cells.remove(username, entry[1].get_position())
+        self.interest.remove(username)
+        return True
+
+    def set_locale(self, username: str, locale: str) -> None:
+        """Change the locale of a player."""
+        conn, gamer, _ = self.players[username]
+        self._set_players({**self.players, username: (conn, gamer, locale)})
+
+    def _set_players(self, players: Dict[str, PlayerEntry]) -> None:
+        """Swap in a new player registry and its roster."""
+        self.players = players
+        self.roster = tuple(players.items())
+
+    def _player_moved(self, username: str, old: Tuple[int, int],
+                      new: Tuple[int, int]) -> None:
+        """Update the position indexes after a player moved."""
+        self.cells.move(username, old, new)
+        self.interest.move(username, new)
+
+    def players_at(self, pos: Tuple[int, int]) -> FrozenSet[str]:
+        """Get the names of the players standing on a cell."""
+        return self.cells.at(pos)
 
     def get_player(self, username: str) -> Optional[Gamer]:
         """Get a player's Gamer object."""
         return self.players.get(username, (None, None, None))[1]
 
-    def get_translation(self, username: str) -> gettext.GNUTranslations:
+    def new_outbox(self, conn: Connection) -> Outbox:
+        """Create the outbox of a new client connection."""
+        cls = StreamOutbox if isinstance(conn, asyncio.StreamWriter) else SocketOutbox
+        return cls(conn, self.queue_size, self.overflow, autoflush=not self.batched)
+
+    def flush_all(self) -> None:
+        """Write out everything queued for every player."""
+        for _, (conn, _, _) in self.roster:
+            conn.flush()
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Get the number of frames queued for each player."""
+        return {username: conn.queue_depth
+                for username, (conn, _, _) in self.roster}
+
+    def get_translation(self, username: str) -> gettext.NullTranslations:
         """Get translation for a user."""
-        _, _, locale = self.players.get(username, (None, None, 'en_US'))
-        print(f"Getting translation for user {username}, locale {locale}")
-        return self.locales.get(locale, gettext.NullTranslations())
+        _, _, locale = self.players.get(username, (None, None, DEFAULT_LOCALE))
+        translations_log.debug("Getting translation for user %s, locale %s",
+                               username, locale)
+        return self.translation_for(locale)
 
     def add_monster(self, x: int, y: int, name: str, hello: str, hp: int) -> bool:
         """Add a monster to the game field."""
@@ -120,127 +420,211 @@ class Game:
         if not m or m.name != name:
             return False, 0, 0, False
         d = min(dmg, m.hitpoints)
-        m.hitpoints -= d
-        killed = m.hitpoints == 0
+        m.hitpoints = hp = m.hitpoints - d
+        killed = hp == 0
         if killed:
+            # A swarm reuses the slot of a deleted monster, so m goes stale.
             del self.field[pos]
-        return True, d, m.hitpoints, killed
-
-    def send_to_all(self, msg: Dict) -> None:
-        """Send a message to all players with their respective locales."""
-        for username, (conn, _, _) in self.players.items():
-            data = json.dumps(msg).encode() + b"\n"
-            asyncio.run_coroutine_threadsafe(self._send_async(conn,
-                                                              data, username), loop)
-
-    async def _send_async(self, conn: socket.socket,
-                          data: bytes, username: str) -> None:
-        """Asynchronously send localized data to a connection."""
-        try:
-            msg = json.loads(data.decode())
-            t = self.get_translation(username)
-            if msg.get("type") == "broadcast":
-                original = msg["message"]
-                print(f"Translating broadcast for {username}: {original}")
-                if " added " in original and " at " in original:
-                    user, rest = original.split(" added ")
-                    mon, rest = rest.split(" at ")
-                    coords, hello = rest.split(" saying ")
-                    x, y = map(int, coords.strip('()').split(','))
-                    msg["message"] = t.gettext("%s added %s "
-                                               "at (%d,%d) "
-                                               "saying %s") % (user, mon, x, y, hello)
-                elif original.endswith("joined the game!"):
-                    user = original.split()[0]
-                    msg["message"] = t.gettext("%s joined the game!") % user
-                elif original.endswith("left the game!"):
-                    user = original.split()[0]
-                    msg["message"] = t.gettext("%s left the game!") % user
-                elif "attacked" in original:
-                    parts = original.split()
-                    user, mon, weapon, dealt = (parts[0], parts[2],
-                                                parts[4].rstrip(','), int(parts[6]))
-                    if original.endswith("was killed!"):
-                        msg["message"] = t.ngettext(
-                            "%s attacked %s with %s, "
-                            "dealing %d damage. %s was killed!",
-                            "%s attacked %s with %s, "
-                            "dealing %d damage. %s has %d HP remaining.",
-                            0
-                        ) % (user, mon, weapon, dealt, mon)
-                    else:
-                        hp = int(parts[-3])
-                        msg["message"] = t.ngettext(
-                            "%s attacked %s with %s, "
-                            "dealing %d damage. %s was killed!",
-                            "%s attacked %s with %s, "
-                            "dealing %d damage. %s has %d HP remaining.",
-                            hp
-                        ) % (user, mon, weapon, dealt, mon, hp)
-                elif " moved to " in original:
-                    user, coords = original.split(" moved to ")
-                    x, y = map(int, coords.strip('()').split(','))
-                    msg["message"] = t.gettext("%s moved to (%d,%d)") % (user, x, y)
-                elif "Monster" in original and "moved one cell" in original:
-                    name = original.split(" moved")[0].replace("Monster ", "")
-                    direction = original.split(" moved one cell ")[1]
-                    msg["message"] = t.gettext("Monster %s "
-                                               "moved one cell %s") % (name, direction)
-            data = json.dumps(msg).encode() + b"\n"
-            conn.send(data)
-            print(f"Sent to {conn.getpeername()}: {data.decode()}")
-        except Exception as e:
-            print(f"Send error to {conn.getpeername()}: {e}")
+        return True, d, hp, killed
+
+    def translation_for(self, locale: str) -> gettext.NullTranslations:
+        """Get translation for a locale name."""
+        return translation(locale)
 
-    def move_random_monster(self) -> None:
-        """Move a random monster to an adjacent cell if moving_monsters is enabled."""
+    def send_to_all(self, event: Event) -> None:
+        """Send an event to all players with their respective locales."""
+        self._deliver(event, self.roster)
+
+    def send_nearby(self, event: Event, pos: Tuple[int, int]) -> None:
+        """Send an event to the players who can see a cell."""
+        players = self.players
+        self._deliver(event, [(username, players[username])
+                              for username in self.interest.near(pos)])
+
+    def _deliver(self, event: Event,
+                 entries: Iterable[Tuple[str, PlayerEntry]]) -> None:
+        """Send an event to some players with their respective locales.
+
+        The event is rendered and encoded once per distinct locale, and all
+        players sharing a locale are sent the same bytes.
+        """
+        started = time.perf_counter()
+        encoded: Dict[str, bytes] = {}
+        key = coalesce_key(event)
+        sent = 0
+        for _, (conn, _, locale) in entries:
+            data = encoded.get(locale)
+            if data is None:
+                data = encoded[locale] = encode_event(
+                    event, self.translation_for(locale))
+            conn.send(data, key)
+            sent += 1
+        self.metrics.record_fanout(time.perf_counter() - started, sent)
+
+    def move_random_monster(self, seed: Optional[int] = None) -> None:
+        """Move a random monster to an adjacent cell if moving_monsters is enabled.
+
+        Every step draws a seed from rng for its own choices and journals it,
+        so replaying the journal repeats the step.
+
+        Args:
+            seed (int): Seed of the step, given when replaying the journal.
+        """
         if not self.moving_monsters or not self.field:
             return
-        directions = [
-            ("right", (1, 0)),
-            ("left", (-1, 0)),
-            ("up", (0, -1)),
-            ("down", (0, 1))
-        ]
-        max_attempts = len(self.field) * len(directions)
+        if seed is None:
+            seed = self.rng.getrandbits(32)
+        if self.recorder is not None:
+            self.recorder.record("monsters")
+        if self.vectorized:
+            self.step_monsters(seed)
+        else:
+            self._wander(random.Random(seed))
+        if self.journal is not None:
+            self.journal.append("", {"type": "monsters", "seed": seed})
+
+    def _wander(self, rng: random.Random) -> None:
+        """Move one random monster of a plain World which is able to move."""
+        keys = list(self.field.keys())
+        max_attempts = len(keys) * len(MONSTER_DIRECTIONS)
         attempts = 0
 
         while attempts < max_attempts:
-            key = random.choice(list(self.field.keys()))
-            monster = self.field[key]
-            direction, (dx, dy) = random.choice(directions)
-            new_x = (monster.x + dx) % 10
-            new_y = (monster.y + dy) % 10
-            new_pos = (new_x, new_y)
-
-            if new_pos not in self.field or new_pos == key:
-                old_pos = (monster.x, monster.y)
-                monster.x, monster.y = new_x, new_y
-                self.field[new_pos] = self.field.pop(old_pos)
-                self.send_to_all({
-                    "type": "broadcast",
-                    "message": f"Monster {monster.name} moved one cell {direction}"
-                })
-                for username, (gamer_conn, gamer, _) in list(self.players.items()):
-                    if gamer.get_position() == new_pos:
-                        if gamer_conn:
-                            try:
-                                gamer_conn.send(json.dumps({
-                                    "type": "encounter",
-                                    "name": monster.name,
-                                    "hello": monster.hello
-                                }).encode() + b"\n")
-                            except Exception as e:
-                                print(f"Error sending encounter to {username}: {e}")
-                                self.remove_player(username)
+            key = rng.choice(keys)
+            direction, (dx, dy) = rng.choice(MONSTER_DIRECTIONS)
+            monster = self._move_monster(key, dx, dy)
+            if monster is not None:
+                new_pos = (monster.x, monster.y)
+                self.send_nearby(Event("monster_moved", (monster.name, direction)),
+                                 new_pos)
+                self._encounter(monster, new_pos)
                 break
             attempts += 1
 
+    def _move_monster(self, key: Tuple[int, int], dx: int,
+                      dy: int) -> Optional[Monster]:
+        """Move the monster on a cell unless the target cell is taken.
+
+        Returns:
+            Monster: The moved monster, or None if it could not move.
+        """
+        monster = self.field.get(key)
+        if monster is None:
+            return None
+        new_pos = self.field.wrap(monster.x + dx, monster.y + dy)
+        if new_pos in self.field and new_pos != key:
+            return None
+        monster.x, monster.y = new_pos
+        self.field[new_pos] = self.field.pop(key)
+        return monster
 
-def schedule_monster_movement(game: Game) -> None:
-    """Schedule periodic monster movement every 30 seconds."""
-    game.move_random_monster()
-    threading.Timer(30.0, schedule_monster_movement, args=[game]).start()
+    def step_monsters(self, seed: Optional[int] = None) -> None:
+        """Move every monster of a vectorized field by one cell at once.
+
+        Each player is sent one batched event with all the moves they can see.
+
+        Args:
+            seed (int): Seed of the directions, see MonsterSwarm.step().
+        """
+        moves = self.field.step(seed)
+        if not self.players or not len(moves.indices):
+            return
+        seen: Dict[str, list] = {}
+        strings, name_ids = self.field.strings, self.field.name_ids
+        for index, direction, x, y in zip(
+                *(array.tolist() for array in visible_moves(moves, self.interest))):
+            move = (strings[name_ids[index]], DIRECTIONS[direction])
+            for username in self.interest.near((x, y)):
+                seen.setdefault(username, []).append(move)
+            self._encounter(self.field[x, y], (x, y))
+        for username, batch in seen.items():
+            self._deliver(Event("monsters_moved", tuple(batch)),
+                          [(username, self.players[username])])
+
+    def _encounter(self, monster, pos: Tuple[int, int]) -> None:
+        """Greet the players standing on the cell a monster moved to."""
+        players_here = self.players_at(pos)
+        if players_here:
+            data = encode_frame({
+                "type": "encounter",
+                "name": monster.name,
+                "hello": monster.hello
+            })
+            players = self.players
+            for username in players_here & players.keys():
+                players[username][0].send(data)
+
+
+class StripedGame(Game):
+    """Game state guarded by fine-grained locks instead of an actor.
+
+    The field takes a lock per chunk stripe and the player registry and
+    position indexes share one lock, so client threads run commands in
+    parallel on a free-threaded (no-GIL) CPython build. Vectorized fields
+    are not supported.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the game; takes the same arguments as Game."""
+        super().__init__(*args, **kwargs)
+        if self.vectorized:
+            raise ValueError("A striped game cannot use a vectorized field")
+        self.field = StripedWorld(self.field.width, self.field.height)
+        self._registry = threading.RLock()
+
+    def add_player(self, username: str, conn: Outbox) -> bool:
+        """Add a player to the game."""
+        with self._registry:
+            return super().add_player(username, conn)
+
+    def remove_player(self, username: str) -> bool:
+        """Remove a player from the game."""
+        with self._registry:
+            return super().remove_player(username)
+
+    def set_locale(self, username: str, locale: str) -> None:
+        """Change the locale of a player."""
+        with self._registry:
+            super().set_locale(username, locale)
+
+    def _player_moved(self, username: str, old: Tuple[int, int],
+                      new: Tuple[int, int]) -> None:
+        with self._registry:
+            super()._player_moved(username, old, new)
+
+    def players_at(self, pos: Tuple[int, int]) -> FrozenSet[str]:
+        """Get the names of the players standing on a cell."""
+        with self._registry:
+            return super().players_at(pos)
+
+    def send_to_all(self, event: Event) -> None:
+        """Send an event to all players with their respective locales."""
+        with self._registry:
+            super().send_to_all(event)
+
+    def send_nearby(self, event: Event, pos: Tuple[int, int]) -> None:
+        """Send an event to the players who can see a cell."""
+        with self._registry:
+            super().send_nearby(event, pos)
+
+    def add_monster(self, x: int, y: int, name: str, hello: str, hp: int) -> bool:
+        """Add a monster to the game field."""
+        with self.field.lock_for((x, y)):
+            return super().add_monster(x, y, name, hello, hp)
+
+    def attack_monster(self, username: str, name: str,
+                       weapon: str, dmg: int) -> Tuple[bool, int, int, bool]:
+        """Handle a player attacking a monster."""
+        p = self.get_player(username)
+        if not p:
+            return False, 0, 0, False
+        with self.field.lock_for(p.get_position()):
+            return super().attack_monster(username, name, weapon, dmg)
+
+    def _move_monster(self, key: Tuple[int, int], dx: int,
+                      dy: int) -> Optional[Monster]:
+        with self.field.locked(key, self.field.wrap(key[0] + dx, key[1] + dy)):
+            return super()._move_monster(key, dx, dy)
 
 
 def handle_move(game: Game, user: str, cmd: Dict) -> Dict:
@@ -252,7 +636,7 @@ def handle_move(game: Game, user: str, cmd: Dict) -> Dict:
     p.move(cmd["dx"], cmd["dy"])
     x, y = p.get_position()
     m = game.field.get((x, y))
-    game.send_to_all({"type": "broadcast", "message": f"{user} moved to ({x},{y})"})
+    game.send_nearby(Event("moved", (user, x, y)), (x, y))
     return (
         {"type": "encounter", "name": m.name, "hello": m.hello}
         if m else {"type": "position",
@@ -264,11 +648,12 @@ def handle_addmon(game: Game, user: str, cmd: Dict) -> Dict:
     """Handle the addmon command."""
     t = game.get_translation(user)
     x, y, n, h, hp = cmd["x"], cmd["y"], cmd["name"], cmd["hello"], cmd["hp"]
+    if not game.field.contains(x, y):
+        return {"type": "error",
+                "message": t.gettext("Coordinates (%d, %d) are outside the world")
+                % (x, y)}
     replaced = game.add_monster(x, y, n, h, hp)
-    game.send_to_all({
-        "type": "broadcast",
-        "message": f"{user} added {n} at ({x},{y}) saying {h}"
-    })
+    game.send_to_all(Event("added", (user, n, x, y, h)))
     message = t.gettext("Added monster at (%d, %d)") % (x, y)
     if replaced:
         message += "\n" + t.gettext("Replaced the old monster")
@@ -281,11 +666,7 @@ def handle_attack(game: Game, user: str, cmd: Dict) -> Dict:
     n, dmg, w = cmd["name"], cmd["damage"], cmd.get("weapon", "unknown")
     ok, dealt, hp, dead = game.attack_monster(user, n, w, dmg)
     if ok:
-        msg = (
-            f"{user} attacked {n} with {w}, dealing {dealt} damage. "
-            f"{n} {'was killed!' if dead else f'has {hp} HP remaining.'}"
-        )
-        game.send_to_all({"type": "broadcast", "message": msg})
+        game.send_to_all(Event("attacked", (user, n, w, dealt, hp)))
         message = t.gettext("Attacked %s, damage %d hp") % (n, dealt)
         if dead:
             message += "\n" + t.gettext("%s died") % n
@@ -300,7 +681,7 @@ def handle_sayall(game: Game, user: str, cmd: Dict) -> Dict:
     """Handle the sayall command."""
     t = game.get_translation(user)
     message = cmd["message"]
-    game.send_to_all({"type": "broadcast", "message": f"{user}: {message}"})
+    game.send_to_all(Event("said", (user, message)))
     return {"type": "sayall_result",
             "message": t.gettext("Message \"%s\" sent") % message}
 
@@ -329,23 +710,40 @@ def handle_locale(game: Game, user: str, cmd: Dict) -> Dict:
     """Handle the locale command."""
     t = game.get_translation(user)
     locale = cmd.get("locale")
-    if locale not in ["en_US", "ru_RU"]:
+    if locale not in available_locales():
         return {"type": "error",
                 "message": t.gettext("Unsupported locale: %s") % locale}
-    conn, gamer, _ = game.players[user]
-    game.players[user] = (conn, gamer, locale)
+    game.set_locale(user, locale)
     t = game.get_translation(user)
-    print(f"Set locale for {user} to {locale}")
+    commands_log.debug("Set locale for %s to %s", user, locale)
     return {"type": "locale_result", "message": t.gettext("Set up locale: %s") % locale}
 
 
+def handle_stats(game: Game, user: str, cmd: Dict) -> Dict:
+    """Handle the stats command."""
+    t = game.get_translation(user)
+    if user not in game.admins:
+        return {"type": "error", "message": t.gettext("Permission denied")}
+    stats = collect(game)
+    lines = [t.gettext("Players: %d, monsters: %d, queued frames: %d")
+             % (stats["players"], stats["monsters"], stats["queued_frames"])]
+    for name, row in stats["commands"].items():
+        lines.append(t.gettext("%s: %d calls, p50 %.2f ms, p99 %.2f ms")
+                     % (name, row["count"], row["p50_ms"], row["p99_ms"]))
+    scheduler = stats.get("scheduler")
+    if scheduler is not None:
+        lines.append(t.gettext("Ticks: %d, overruns: %d")
+                     % (scheduler["ticks"], scheduler["overruns"]))
+    return {"type": "stats_result", "message": "\n".join(lines), "stats": stats}
+
+
 def handle_help(game: Game, user: str, cmd: Dict) -> Dict:
     """Handle the help command."""
     t = game.get_translation(user)
     command = cmd.get("command", "")
     commands = [
         "attack", "help", "locale", "movemonsters", "right", "timer",
-        "addmon", "down", "left", "move", "sayall", "up", "quit", "EOF"
+        "addmon", "down", "left", "move", "sayall", "stats", "up", "quit", "EOF"
     ]
     if not command:
         message = t.gettext("Available commands: %s") % ", ".join(commands)
@@ -365,64 +763,192 @@ COMMANDS = {
     "timer": handle_timer,
     "movemonsters": handle_movemonsters,
     "locale": handle_locale,
+    "stats": handle_stats,
     "help": handle_help
 }
 
 
-def handle_client(conn: socket.socket, addr: Tuple[str, int],
-                  game: Game, user: str) -> None:
-    """Handle a client connection."""
+def dispatch(game: Game, user: str, cmd: Dict) -> Dict:
+    """Run a client command through COMMANDS and return the response.
+
+    Every command is recorded if the session is, and state-changing commands
+    are appended to the game's journal once they have been handled; a
+    malformed command whose handler raises is not journaled, so replaying
+    the journal cannot fail on it. The handling time goes to the game's
+    metrics under the command name.
+    """
+    if game.recorder is not None:
+        game.recorder.record("cmd", user, cmd)
+    name = cmd.get("type")
+    h = COMMANDS.get(name)
+    if h is None:
+        name, h = "unknown", lambda g, u, c: {
+            "type": "error",
+            "message": g.get_translation(u).gettext("Unknown command")}
+    started = time.perf_counter()
+    try:
+        res = h(game, user, cmd)
+    finally:
+        game.metrics.record_command(name, time.perf_counter() - started)
+    if game.journal is not None and name in JOURNALED:
+        game.journal.append(user, cmd)
+    return res
+
+
+def reply(cmd: Dict, res: Dict) -> bytes:
+    """Encode the direct response to a command.
+
+    A client may tag a command with an ``id`` of its choice, which is echoed
+    in the response, so it can keep several commands in flight on one
+    connection and match the responses to them. Broadcasts and other frames
+    sent on the game's behalf never carry one.
+    """
+    request_id = cmd.get("id")
+    if request_id is not None:
+        res = dict(res, id=request_id)
+    return encode_frame(res)
+
+
+def replay(game: Game, records: Iterable[Tuple[int, str, Dict]]) -> int:
+    """Apply journal records to a game with no connected players.
+
+    Players take part with a NullOutbox between their join and leave records,
+    and leaving forgets their position as it does live. A player who sends a
+    command with no join record before it was connected when the snapshot
+    was taken, and comes back at their saved position. Players still in the
+    game at the end are kept in saved_positions. A record which fails is
+    logged and skipped, so one bad record cannot keep the server from
+    starting.
+
+    Args:
+        game (Game): The game, typically just restored from a snapshot.
+        records (iterable): (seq, username, command) records.
+
+    Returns:
+        int: Seq of the last record applied, or 0 if there were none.
+    """
+    seq = 0
+    for seq, user, cmd in records:
+        try:
+            _apply_record(game, user, cmd)
+        except Exception as e:
+            log.warning("Skipping journal record %d of %s: %r", seq, user, e)
+    for user, (_, gamer, _) in game.roster:
+        game.saved_positions[user] = gamer.get_position()
+        game.remove_player(user)
+    return seq
+
+
+def _apply_record(game: Game, user: str, cmd: Dict) -> None:
+    """Apply one journal record to a game being replayed."""
+    name = cmd.get("type")
+    if name == "monsters":
+        game.move_random_monster(cmd["seed"])
+    elif name == "leave":
+        if not game.remove_player(user):
+            game.saved_positions.pop(user, None)
+    else:
+        game.add_player(user, NullOutbox())
+        if name != "join":
+            dispatch(game, user, cmd)
+
+
+def throttle(game: Game, user: str, cmd: Dict,
+             limiter: RateLimiter) -> Tuple[float, Optional[Dict]]:
+    """Check a command against the rate limits of its connection.
+
+    Runs in the connection handler, before the command reaches the actor.
+
+    Returns:
+        tuple: Seconds to wait before running the command, and the error
+            response to send instead of running it, or None.
+    """
+    defer = game.rate_policy == "defer"
+    wait = limiter.check(cmd.get("type"), reserve=defer)
+    if not wait:
+        return 0.0, None
+    game.metrics.record_throttled()
+    if defer:
+        return wait, None
     t = game.get_translation(user)
-    conn.send(json.dumps({
+    return 0.0, {"type": "error",
+                 "message": t.gettext("Too many commands, retry in %.1f s") % wait}
+
+
+def welcome(game: Game, user: str) -> bytes:
+    """Build the welcome message for a freshly connected player."""
+    t = game.get_translation(user)
+    return encode_frame({
         "type": "welcome",
-        "message": t.gettext("Welcome, %s!") % user
-    }).encode() + b"\n")
-    game.send_to_all({"type": "broadcast", "message": f"{user} joined the game!"})
+        "message": t.gettext("Welcome, %s!") % user,
+        "width": game.field.width,
+        "height": game.field.height,
+        "locales": sorted(available_locales())
+    })
+
+
+def join(game: Game, user: str, conn: Connection) -> Optional[Outbox]:
+    """Add a connected player and announce them to everyone.
+
+    Returns:
+        Outbox: The new player's outbox, or None if the name is taken.
+    """
+    if user in game.players:
+        return None
+    outbox = game.new_outbox(conn)
+    enter(game, user, outbox)
+    return outbox
+
+
+def enter(game: Game, user: str, outbox: Outbox) -> None:
+    """Add a player with a free name, welcome them and announce them."""
+    if game.recorder is not None:
+        game.recorder.record("join", user)
+    if game.journal is not None:
+        game.journal.append(user, {"type": "join"})
+    game.add_player(user, outbox)
+    outbox.send(welcome(game, user))
+    game.send_to_all(Event("joined", (user,)))
+
+
+def leave(game: Game, user: str) -> None:
+    """Remove a disconnected player and tell everyone they left."""
+    if game.recorder is not None:
+        game.recorder.record("leave", user)
+    if game.journal is not None:
+        game.journal.append(user, {"type": "leave"})
+    game.remove_player(user)
+    game.send_to_all(Event("left", (user,)))
+
+
+def handle_client(conn: socket.socket, addr: Tuple[str, int], actor: GameActor,
+                  user: str, outbox: Outbox, decoder: FrameDecoder) -> None:
+    """Handle a client connection."""
+    limiter = RateLimiter(actor.game.rate_limits)
     try:
         while True:
-            data = b""
-            while True:
-                chunk = conn.recv(1024)
-                if not chunk:
-                    raise ConnectionError
-                data += chunk
-                try:
-                    cmd = json.loads(data.decode())
-                    break
-                except json.JSONDecodeError:
-                    continue
-            h = COMMANDS.get(
-                cmd["type"],
-                lambda g, u, c: {"type": "error",
-                                 "message": g.get_translation(u).
-                                 gettext("Unknown command")}
-            )
-            res = h(game, user, cmd)
-            conn.send(json.dumps(res).encode() + b"\n")
+            cmd = recv_frame(conn, decoder)
+            wait, res = throttle(actor.game, user, cmd, limiter)
+            if wait:
+                time.sleep(wait)
+            if res is None:
+                res = actor.call(dispatch, actor.game, user, cmd)
+            outbox.send(reply(cmd, res))
     except Exception as e:
-        print(f"{user} disconnected: {e}")
+        connections_log.info("%s disconnected: %s", user, e)
     finally:
-        game.remove_player(user)
-        game.send_to_all({"type": "broadcast", "message": f"{user} left the game!"})
+        actor.call(leave, actor.game, user)
+        outbox.close()
         conn.close()
 
 
-def accept_connections(sock: socket.socket, game: Game) -> None:
+def accept_connections(sock: socket.socket, actor: GameActor) -> None:
     """Accept incoming client connections."""
     while True:
         try:
             conn, addr = sock.accept()
-            data = b""
-            while True:
-                chunk = conn.recv(1024)
-                if not chunk:
-                    raise ConnectionError
-                data += chunk
-                try:
-                    auth = json.loads(data.decode())
-                    break
-                except json.JSONDecodeError:
-                    continue
+            decoder = FrameDecoder()
+            auth = recv_frame(conn, decoder)
             user = auth.get("username")
             if not user:
                 conn.send(json.dumps({
@@ -431,7 +957,8 @@ def accept_connections(sock: socket.socket, game: Game) -> None:
                 }).encode() + b"\n")
                 conn.close()
                 continue
-            if not game.add_player(user, conn):
+            outbox = actor.call(join, actor.game, user, conn)
+            if outbox is None:
                 conn.send(json.dumps({
                     "type": "error",
                     "message": "Username taken"
@@ -440,18 +967,56 @@ def accept_connections(sock: socket.socket, game: Game) -> None:
                 continue
             t = threading.Thread(
                 target=handle_client,
-                args=(conn, addr, game, user),
+                args=(conn, addr, actor, user, outbox, decoder),
                 daemon=True
             )
             t.start()
         except Exception as e:
-            print(f"Accept error: {e}")
+            connections_log.warning("Accept error: %s", e)
 
 
-loop = asyncio.new_event_loop()
-
-
-def start_loop() -> None:
-    """Start the asyncio event loop."""
-    asyncio.set_event_loop(loop)
-    loop.run_forever()
+async def handle_connection(reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter,
+                            actor: GameActor) -> None:
+    """Authenticate an asyncio client and serve it until it disconnects."""
+    decoder = FrameDecoder()
+    try:
+        auth = await read_frame(reader, decoder)
+    except Exception as e:
+        connections_log.warning("Accept error: %s", e)
+        writer.close()
+        return
+    user = auth.get("username")
+    outbox = None
+    if user:
+        outbox = await actor.call_async(join, actor.game, user, writer)
+    if outbox is None:
+        writer.write(json.dumps({
+            "type": "error",
+            "message": "Username taken" if user else "Username required"
+        }).encode() + b"\n")
+        await writer.drain()
+        writer.close()
+        return
+    await handle_client_async(reader, actor, user, outbox, decoder)
+
+
+async def handle_client_async(reader: asyncio.StreamReader, actor: GameActor,
+                              user: str, outbox: Outbox,
+                              decoder: FrameDecoder) -> None:
+    """Handle an asyncio client connection."""
+    limiter = RateLimiter(actor.game.rate_limits)
+    try:
+        while True:
+            cmd = await read_frame(reader, decoder)
+            wait, res = throttle(actor.game, user, cmd, limiter)
+            if wait:
+                await asyncio.sleep(wait)
+            if res is None:
+                res = await actor.call_async(dispatch, actor.game, user, cmd)
+            outbox.send(reply(cmd, res))
+    except Exception as e:
+        connections_log.info("%s disconnected: %s", user, e)
+    finally:
+        await actor.call_async(leave, actor.game, user)
+        outbox.close()
@@ -0,0 +1,317 @@
+"""World snapshots of the MOOD server.
+
+A snapshot is a compact little-endian binary file::
+
+    header    HEADER: magic, version, world size, record and string counts,
+              seq of the last journal record applied
+    monsters  MONSTER records: x, y, hit points, name id, greeting id
+    players   PLAYER records: name id, x, y
+    strings   string table: u32 length + UTF-8 bytes, indexed by the ids
+
+Snapshots are written to a temporary file which is fsynced and renamed over
+the old one, so a crash leaves either the old or the new snapshot. Writing
+does not pause the game: a plain World is serialized by a forked child,
+which sees a copy-on-write image of the process, and a MonsterSwarm is
+copied in one pass of array copies and written by a background thread.
+Restoring memory-maps the file and reads the records in place.
+
+With a journal, taking a snapshot starts a new journal segment, and once the
+snapshot is written the segments it covers are deleted.
+"""
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, List, NamedTuple, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..common.models import Monster
+from .journal import Journal
+from .simulation import MonsterSwarm
+
+MAGIC = b"MOODSNAP"
+VERSION = 2
+HEADER = struct.Struct("<8sHIIQIIQ")
+MONSTER = struct.Struct("<IIqII")
+PLAYER = struct.Struct("<III")
+LENGTH = struct.Struct("<I")
+SNAPSHOT_INTERVAL = 60.0
+MONSTER_FIELDS = [("x", "<u4"), ("y", "<u4"), ("hp", "<i8"),
+                  ("name", "<u4"), ("hello", "<u4")]
+
+log = logging.getLogger(__name__)
+
+
+class SnapshotView(NamedTuple):
+    """Game state captured for a snapshot.
+
+    Attributes:
+        width (int): World width in cells.
+        height (int): World height in cells.
+        count (int): Number of monsters.
+        monsters: Packed MONSTER records, bytes or a NumPy record array.
+        players (bytes): Packed PLAYER records.
+        strings (list): The string table.
+        seq (int): Seq of the last journal record applied to the state.
+    """
+
+    width: int
+    height: int
+    count: int
+    monsters: Union[bytes, "np.ndarray"]
+    players: bytes
+    strings: List[str]
+    seq: int = 0
+
+
+def capture(game, seq: int = 0) -> SnapshotView:
+    """Pack the monsters and player positions of a game.
+
+    Players who have not come back since the last restore keep their saved
+    positions. A swarm is sorted by cell in place first, which is the order
+    restoring gives its monsters, so journal replay moves them alike.
+
+    Args:
+        game (Game): The game to capture.
+        seq (int): Seq of the last journal record applied to the game.
+
+    Returns:
+        SnapshotView: The packed state.
+    """
+    field = game.field
+    strings: List[str] = []
+    ids: Dict[str, int] = {}
+
+    def intern(text: str) -> int:
+        index = ids.get(text)
+        if index is None:
+            index = ids[text] = len(strings)
+            strings.append(text)
+        return index
+
+    if isinstance(field, MonsterSwarm):
+        field.sort()
+        for text in field.strings:
+            intern(text)
+        count = len(field)
+        monsters = np.empty(count, MONSTER_FIELDS)
+        monsters["x"], monsters["y"] = field.xs[:count], field.ys[:count]
+        monsters["hp"] = field.hp[:count]
+        monsters["name"] = field.name_ids[:count]
+        monsters["hello"] = field.hello_ids[:count]
+    else:
+        count = len(field)
+        monsters = b"".join(
+            MONSTER.pack(x, y, m.hitpoints, intern(m.name), intern(m.hello))
+            for (x, y), m in field.items())
+    positions = dict(game.saved_positions)
+    positions.update((name, entry[1].get_position()) for name, entry in game.roster)
+    players = b"".join(PLAYER.pack(intern(name), x, y)
+                       for name, (x, y) in positions.items())
+    return SnapshotView(field.width, field.height, count, monsters, players,
+                        strings, seq)
+
+
+def write_snapshot(path: str, view: SnapshotView) -> None:
+    """Write a snapshot atomically.
+
+    Args:
+        path (str): Destination file.
+        view (SnapshotView): State returned by capture().
+    """
+    tmp = f"{path}.tmp"
+    encoded = [text.encode() for text in view.strings]
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, view.width, view.height, view.count,
+                            len(view.players) // PLAYER.size, len(encoded),
+                            view.seq))
+        f.write(view.monsters)
+        f.write(view.players)
+        for data in encoded:
+            f.write(LENGTH.pack(len(data)))
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def restore(game, path: str) -> int:
+    """Load monsters and saved player positions from a snapshot.
+
+    Args:
+        game (Game): A game with an empty field of the snapshot's size.
+        path (str): Snapshot file.
+
+    Returns:
+        int: Number of monsters restored.
+
+    Raises:
+        ValueError: If the file is not a snapshot or its world size differs.
+    """
+    with open(path, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if len(mm) < HEADER.size:
+            raise ValueError(f"{path} is not a MOOD snapshot")
+        magic, version, width, height, count, players, nstrings, _ = \
+            HEADER.unpack_from(mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a MOOD snapshot")
+        field = game.field
+        if (width, height) != (field.width, field.height):
+            raise ValueError(f"Snapshot world is {width}x{height}, "
+                             f"server world is {field.width}x{field.height}")
+        offset = HEADER.size
+        monsters = memoryview(mm)[offset:offset + count * MONSTER.size]
+        offset += len(monsters)
+        records = memoryview(mm)[offset:offset + players * PLAYER.size]
+        offset += len(records)
+        strings = []
+        for _ in range(nstrings):
+            (length,) = LENGTH.unpack_from(mm, offset)
+            offset += LENGTH.size
+            strings.append(mm[offset:offset + length].decode())
+            offset += length
+        if isinstance(field, MonsterSwarm):
+            array = np.frombuffer(monsters, MONSTER_FIELDS)
+            field.load(array["x"], array["y"], array["hp"], array["name"],
+                       array["hello"], strings)
+            del array
+        else:
+            for x, y, hp, name, hello in MONSTER.iter_unpack(monsters):
+                field[x, y] = Monster(x, y, strings[name], strings[hello], hp)
+        game.saved_positions = {strings[name]: (x, y)
+                                for name, x, y in PLAYER.iter_unpack(records)}
+        monsters.release()
+        records.release()
+    return count
+
+
+def snapshot_seq(path: str) -> int:
+    """Get the seq of the last journal record included in a snapshot.
+
+    Raises:
+        ValueError: If the file is not a snapshot.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a MOOD snapshot")
+    return HEADER.unpack(header)[-1]
+
+
+class Snapshotter:
+    """Writes snapshots of a game in the background, one at a time.
+
+    Attributes:
+        path (str): Snapshot file.
+        use_fork (bool): Whether a plain World is written by a forked child.
+        journal (Journal): Journal rotated with every snapshot, or None.
+        written (int): Number of snapshots written so far.
+        failed (int): Number of snapshots which could not be written.
+    """
+
+    def __init__(self, game, path: str, use_fork: bool = hasattr(os, "fork"),
+                 journal: Optional[Journal] = None):
+        """Initialize a snapshotter.
+
+        Args:
+            game (Game): The game to snapshot.
+            path (str): Snapshot file.
+            use_fork (bool): Whether to write a plain World from a forked
+                child; otherwise it is captured in place, which pauses the
+                game for the time of the capture.
+            journal (Journal): Journal to rotate with every snapshot.
+        """
+        self.game = game
+        self.path = path
+        self.use_fork = use_fork
+        self.journal = journal
+        self.written = 0
+        self.failed = 0
+        self._seq = 0
+        self._ok = False
+        self._pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a snapshot is being written."""
+        if self._pid is not None:
+            pid, status = os.waitpid(self._pid, os.WNOHANG)
+            if pid == 0:
+                return True
+            self._reaped(status)
+        if self._thread is not None:
+            if self._thread.is_alive():
+                return True
+            self._thread = None
+            self._finished(self._ok)
+        return False
+
+    def start(self) -> bool:
+        """Start writing a snapshot of the current state.
+
+        Must run on the owner of the game, so the state is consistent.
+
+        Returns:
+            bool: False if the previous snapshot is still being written.
+        """
+        if self.busy:
+            return False
+        self._seq = self.journal.rotate() if self.journal is not None else 0
+        if self.use_fork and not isinstance(self.game.field, MonsterSwarm):
+            pid = os.fork()
+            if pid == 0:
+                code = 1
+                try:
+                    write_snapshot(self.path, capture(self.game, self._seq))
+                    code = 0
+                finally:
+                    os._exit(code)
+            self._pid = pid
+        else:
+            self._thread = threading.Thread(target=self._write,
+                                            args=(capture(self.game, self._seq),),
+                                            daemon=True)
+            self._thread.start()
+        return True
+
+    def wait(self) -> None:
+        """Wait until the snapshot being written is finished."""
+        if self._pid is not None:
+            self._reaped(os.waitpid(self._pid, 0)[1])
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self._finished(self._ok)
+
+    def _reaped(self, status: int) -> None:
+        self._pid = None
+        self._finished(os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0)
+
+    def _finished(self, ok: bool) -> None:
+        if not ok:
+            self.failed += 1
+            return
+        self.written += 1
+        if self.journal is not None:
+            self.journal.discard_until(self._seq)
+
+    def _write(self, view: SnapshotView) -> None:
+        self._ok = False
+        try:
+            write_snapshot(self.path, view)
+            self._ok = True
+        except OSError as e:
+            log.error("Snapshot error: %s", e)
@@ -0,0 +1,187 @@
+"""Sparse world grid of the MOOD server.
+
+The world is a wrapped (torus) grid of up to MAX_WORLD_SIZE cells per side.
+Cells are grouped into square chunks, and a chunk is only allocated while it
+holds at least one monster, so memory grows with the population of the world
+rather than with its area.
+"""
+import threading
+from collections.abc import MutableMapping
+from contextlib import ExitStack, contextmanager
+from typing import Dict, FrozenSet, Iterator, List, Set, Tuple
+
+from ..common.models import WORLD_HEIGHT, WORLD_WIDTH, Monster
+
+Position = Tuple[int, int]
+MAX_WORLD_SIZE = 1_000_000
+CHUNK_SIZE = 64
+LOCK_STRIPES = 64
+
+
+class World(MutableMapping):
+    """Mapping of cell positions to the monsters standing on them.
+
+    Attributes:
+        width (int): World width in cells.
+        height (int): World height in cells.
+        chunk_size (int): Side of a chunk in cells.
+    """
+
+    def __init__(self, width: int = WORLD_WIDTH, height: int = WORLD_HEIGHT,
+                 chunk_size: int = CHUNK_SIZE):
+        """Initialize an empty world.
+
+        Args:
+            width (int): World width in cells.
+            height (int): World height in cells.
+            chunk_size (int): Side of a chunk in cells.
+
+        Raises:
+            ValueError: If a dimension is not between 1 and MAX_WORLD_SIZE.
+        """
+        for size in (width, height):
+            if not 1 <= size <= MAX_WORLD_SIZE:
+                raise ValueError(f"World size must be between 1 and "
+                                 f"{MAX_WORLD_SIZE}, got {size}")
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self._chunks: Dict[Position, Dict[Position, Monster]] = {}
+        self._count = 0
+
+    def wrap(self, x: int, y: int) -> Position:
+        """Wrap coordinates around the world edges."""
+        return x % self.width, y % self.height
+
+    def contains(self, x: int, y: int) -> bool:
+        """Check whether coordinates lie inside the world."""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    @property
+    def chunk_count(self) -> int:
+        """Number of allocated chunks."""
+        return len(self._chunks)
+
+    def _chunk_key(self, pos: Position) -> Position:
+        return pos[0] // self.chunk_size, pos[1] // self.chunk_size
+
+    def __getitem__(self, pos: Position) -> Monster:
+        return self._chunks[self._chunk_key(pos)][pos]
+
+    def get(self, pos: Position, default=None):
+        """Get the monster at a position, or default if the cell is empty."""
+        chunk = self._chunks.get(self._chunk_key(pos))
+        return default if chunk is None else chunk.get(pos, default)
+
+    def __contains__(self, pos) -> bool:
+        chunk = self._chunks.get(self._chunk_key(pos))
+        return chunk is not None and pos in chunk
+
+    def __setitem__(self, pos: Position, monster: Monster) -> None:
+        chunk = self._chunks.setdefault(self._chunk_key(pos), {})
+        if pos not in chunk:
+            self._count += 1
+        chunk[pos] = monster
+
+    def __delitem__(self, pos: Position) -> None:
+        key = self._chunk_key(pos)
+        chunk = self._chunks[key]
+        del chunk[pos]
+        self._count -= 1
+        if not chunk:
+            del self._chunks[key]
+
+    def __iter__(self) -> Iterator[Position]:
+        for chunk in list(self._chunks.values()):
+            yield from list(chunk)
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class StripedWorld(World):
+    """World guarded by striped locks for truly parallel threads.
+
+    Every chunk maps to one of a fixed number of reentrant locks, so threads
+    working in different chunks rarely wait for each other. Reads take no
+    lock; writes take the lock of their chunk.
+    """
+
+    def __init__(self, width: int = WORLD_WIDTH, height: int = WORLD_HEIGHT,
+                 chunk_size: int = CHUNK_SIZE, stripes: int = LOCK_STRIPES):
+        """Initialize an empty world.
+
+        Args:
+            width (int): World width in cells.
+            height (int): World height in cells.
+            chunk_size (int): Side of a chunk in cells.
+            stripes (int): Number of locks shared by the chunks.
+        """
+        super().__init__(width, height, chunk_size)
+        self._locks: List[threading.RLock] = [threading.RLock()
+                                              for _ in range(stripes)]
+        self._count_lock = threading.Lock()
+
+    def _stripe(self, pos: Position) -> int:
+        return hash(self._chunk_key(pos)) % len(self._locks)
+
+    def lock_for(self, pos: Position) -> threading.RLock:
+        """Get the lock guarding the chunk of a cell."""
+        return self._locks[self._stripe(pos)]
+
+    @contextmanager
+    def locked(self, *positions: Position) -> Iterator[None]:
+        """Hold the locks of several cells, taken in a fixed order."""
+        with ExitStack() as stack:
+            for stripe in sorted({self._stripe(pos) for pos in positions}):
+                stack.enter_context(self._locks[stripe])
+            yield
+
+    def __setitem__(self, pos: Position, monster: Monster) -> None:
+        with self.lock_for(pos):
+            chunk = self._chunks.setdefault(self._chunk_key(pos), {})
+            added = pos not in chunk
+            chunk[pos] = monster
+        if added:
+            with self._count_lock:
+                self._count += 1
+
+    def __delitem__(self, pos: Position) -> None:
+        key = self._chunk_key(pos)
+        with self.lock_for(pos):
+            chunk = self._chunks[key]
+            del chunk[pos]
+            if not chunk:
+                del self._chunks[key]
+        with self._count_lock:
+            self._count -= 1
+
+
+class CellIndex:
+    """Reverse index from cells to the players standing on them."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._cells: Dict[Position, Set[str]] = {}
+
+    def add(self, username: str, pos: Position) -> None:
+        """Put a player on a cell."""
+        self._cells.setdefault(pos, set()).add(username)
+
+    def remove(self, username: str, pos: Position) -> None:
+        """Take a player off a cell."""
+        players = self._cells.get(pos)
+        if players is None:
+            return
+        players.discard(username)
+        if not players:
+            del self._cells[pos]
+
+    def move(self, username: str, old: Position, new: Position) -> None:
+        """Move a player from one cell to another."""
+        self.remove(username, old)
+        self.add(username, new)
+
+    def at(self, pos: Position) -> FrozenSet[str]:
+        """Get the players standing on a cell."""
+        return frozenset(self._cells.get(pos, ()))
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+import pytest
+from mood.server.actor import GameActor
+
+
+def test_commands_applied_in_order_by_one_thread():
+    """Проверка применения команд из многих потоков одним владельцем."""
+    state = {"log": [], "threads": set()}
+    actor = GameActor(state)
+    actor.start_thread()
+
+    def record(game, item):
+        game["threads"].add(threading.get_ident())
+        game["log"].append(item)
+        return len(game["log"])
+
+    def worker(i):
+        for k in range(100):
+            actor.call(record, state, (i, k))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert actor.call(len, state["log"]) == 400
+    for i in range(4):
+        assert [k for j, k in state["log"] if j == i] == list(range(100))
+    assert len(state["threads"]) == 1
+    actor.stop()
+
+
+def test_errors_reach_the_caller():
+    """Проверка передачи исключения команды вызывающему."""
+    actor = GameActor(None)
+
+    async def main():
+        actor.attach(asyncio.get_running_loop())
+        with pytest.raises(KeyError):
+            await actor.call_async({}.__getitem__, "missing")
+        return await actor.call_async(sum, (1, 2))
+
+    assert asyncio.run(main()) == 3
+    assert actor.applied == 2
@@ -0,0 +1,27 @@
+import asyncio
+import socket
+import threading
+import time
+
+from mood.client.bench import Bench, parse_mix
+from mood.server.server import Server
+
+
+def test_bench_reports_latencies():
+    """Проверка нагрузочного теста против сервера в том же процессе."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('localhost', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    server = Server('localhost', port, tick=0.01)
+    threading.Thread(target=asyncio.run, args=(server.serve(),),
+                     daemon=True).start()
+    time.sleep(0.5)
+
+    bench = Bench('localhost', port, 20, 0.5,
+                  parse_mix("move=2,attack=1,sayall=1"), think=0.01)
+    report = asyncio.run(bench.run())
+    assert report["connected"] == 20 and report["errors"] == 0
+    assert report["commands"]["move"]["count"] > 0
+    assert report["commands"]["sayall"]["p99_ms"] >= 0
+    assert report["broadcast_lag"]["count"] > 0
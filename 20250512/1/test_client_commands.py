@@ -1,7 +1,10 @@
 import pytest
 from unittest.mock import Mock, patch
 import json
+import asyncio
 from mood.client.client import MudCmd
+from mood.client.render import FLOOD_LIMIT, RenderBuffer, encounter_art
+from mood.common.framing import encode_frame
 
 @pytest.fixture
 def client():
@@ -75,4 +78,99 @@ def test_attack_valid_input_2(client):
                 "weapon": "spear",
                 "damage": 15
             }).encode() + b"\n"
-        )
\ No newline at end of file
+        )
+
+
+def test_addmon_uses_world_size(client, capsys):
+    """Проверка ограничения координат размерами мира с сервера."""
+    client.world_width, client.world_height = 1000, 500
+    client.do_addmon('tux coords 700 499 hello "Hi!" hp 50')
+    client.sock.send.assert_called_once()
+    client.sock.send.reset_mock()
+    client.do_addmon('tux coords 700 500 hello "Hi!" hp 50')
+    assert "Invalid parameters" in capsys.readouterr().out
+    client.sock.send.assert_not_called()
+
+
+def test_submit_matches_responses_by_id(client):
+    """Проверка сопоставления ответов с командами по id."""
+    attack = client.submit({"type": "attack", "name": "tux", "damage": 10})
+    timer = client.submit({"type": "timer"})
+    lost = client.submit({"type": "timer"})
+    sent = [json.loads(call.args[0]) for call in client.sock.send.call_args_list]
+    assert [cmd["id"] for cmd in sent] == [1, 2, 3]
+    responses = [{"type": "timer_result", "id": 2},
+                 {"type": "encounter", "name": "tux", "hello": "Hi"},
+                 {"type": "attack_result", "id": 1}]
+
+    async def receive():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"".join(encode_frame(r) for r in responses))
+        reader.feed_eof()
+        await client.receive_messages(reader)
+
+    with patch.object(client, 'display_message') as display:
+        client.loop.run_until_complete(receive())
+    assert timer.result()["type"] == "timer_result"
+    assert attack.result()["type"] == "attack_result"
+    assert isinstance(lost.exception(), ConnectionError)
+    display.assert_called_once()
+    assert client.pending == {} and not client.connected
+
+
+def test_render_buffer_summarizes_move_floods():
+    """Проверка сводки вместо потока перемещений монстров."""
+    buffer = RenderBuffer(flood_limit=3)
+    buffer.add({"type": "broadcast", "event": "monsters_moved",
+                "message": "\n".join(f"Monster m{i} moved one cell up"
+                                     for i in range(2))})
+    buffer.add({"type": "sayall_result", "message": "sent"})
+    for i in range(40):
+        buffer.add({"type": "broadcast", "event": "monster_moved",
+                    "message": f"Monster x{i} moved one cell left"})
+    buffer.add({"type": "broadcast", "event": "said", "message": "a: hi"})
+    messages, summaries = buffer.take()
+    assert [m.get("event", m["type"]) for m in messages] == [
+        "monsters_moved", "sayall_result", "monster_moved", "said"]
+    assert summaries == ["+39 more monster moves"]
+    assert len(buffer) == 0 and buffer.take() == ([], [])
+
+
+def test_messages_are_flushed_together(client):
+    """Проверка вывода пачки сообщений за одну перерисовку."""
+    client.redraw_interval = 0.05
+    moves = [{"type": "broadcast", "event": "moved",
+              "message": f"u{i} moved to (1,1)"} for i in range(20)]
+
+    async def receive():
+        client.handle_messages(moves[:10])
+        client.handle_messages(moves[10:])
+        await asyncio.sleep(0.1)
+
+    with patch.object(client, 'display_message') as display, \
+            patch('mood.client.client.readline') as readline:
+        readline.get_line_buffer.return_value = ""
+        client.loop.run_until_complete(receive())
+    assert display.call_count == FLOOD_LIMIT
+    readline.redisplay.assert_called_once()
+
+
+def test_encounter_art_is_rendered_once(client, capsys):
+    """Проверка кэша картинок встреч с монстрами."""
+    encounter_art.cache_clear()
+    bat = {"type": "encounter", "name": "jgsbat", "hello": "Boo"}
+    for _ in range(3):
+        client.display_message(bat)
+    client.display_message({"type": "encounter", "name": "tux", "hello": "Boo"})
+    out = capsys.readouterr().out
+    assert out.count("jgs") == 3 and "Boo" in out
+    info = encounter_art.cache_info()
+    assert (info.hits, info.misses) == (2, 2)
+    assert "Hi" in encounter_art("no-such-cow", "Hi")
+
+
+def test_locale_completion_uses_server_locales(client):
+    """Проверка дополнения локалей по списку из приветствия сервера."""
+    client.locales = ["de_DE", "en_US", "ru_RU"]
+    assert client.complete_locale("", "locale ", 7, 7) == client.locales
+    assert client.complete_locale("d", "locale d", 7, 8) == ["de_DE"]
@@ -0,0 +1,36 @@
+import json
+import pytest
+from mood.common.framing import FrameDecoder, FrameTooLarge, encode_frame
+
+
+def test_several_frames_in_one_chunk():
+    """Проверка разбора нескольких сообщений, пришедших одним куском."""
+    decoder = FrameDecoder()
+    data = encode_frame({"type": "welcome"}) + encode_frame({"type": "broadcast"})
+    assert decoder.feed(data) == [{"type": "welcome"}, {"type": "broadcast"}]
+
+
+def test_frame_split_between_chunks():
+    """Проверка сборки сообщения, разрезанного на несколько кусков."""
+    decoder = FrameDecoder()
+    data = encode_frame({"type": "sayall", "message": "x" * 5000})
+    messages = []
+    for i in range(0, len(data), 1024):
+        messages += decoder.feed(data[i:i + 1024])
+    assert messages == [json.loads(data)]
+
+
+def test_empty_lines_are_skipped():
+    """Проверка пропуска пустых строк между сообщениями."""
+    decoder = FrameDecoder()
+    assert decoder.feed(b'\n{"a": 1}\n\n') == [{"a": 1}]
+
+
+def test_frame_too_large():
+    """Проверка ограничения размера сообщения."""
+    decoder = FrameDecoder(max_frame_size=16)
+    with pytest.raises(FrameTooLarge):
+        decoder.feed(b'{"message": "' + b"x" * 32)
+    decoder = FrameDecoder(max_frame_size=16)
+    with pytest.raises(FrameTooLarge):
+        decoder.feed(encode_frame({"message": "x" * 32}))
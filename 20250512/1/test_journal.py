@@ -0,0 +1,118 @@
+import pytest
+
+from mood.server.journal import Journal, read_journal, segments
+from mood.server.outbox import NullOutbox
+from mood.server.server import Server, dispatch, enter, leave
+
+
+def test_journal_group_commit(tmp_path):
+    """Проверка записи журнала одним fsync на тик и обрезанного хвоста."""
+    path = str(tmp_path / "journal")
+    journal = Journal(path)
+    for i in range(100):
+        journal.append("a", {"type": "move", "dx": i, "dy": 0})
+    journal.commit()
+    journal.close()
+    assert journal.commits == 1
+    with open(segments(path)[-1][1], "ab") as f:
+        f.write(b'{"seq": 101, "us')
+    records = list(read_journal(path, after=98))
+    assert records == [(99, "a", {"type": "move", "dx": 98, "dy": 0}),
+                       (100, "a", {"type": "move", "dx": 99, "dy": 0})]
+
+
+def test_recover_from_snapshot_and_journal(tmp_path):
+    """Проверка восстановления снимка и повтора журнала после него."""
+    snapshot, journal = str(tmp_path / "world.snap"), str(tmp_path / "journal")
+    server = Server(snapshot=snapshot, journal=journal)
+    game = server.game
+    game.add_player("a", NullOutbox())
+    dispatch(game, "a", {"type": "addmon", "x": 1, "y": 1, "name": "tux",
+                         "hello": "Hi", "hp": 5})
+    server.snapshotter.start()
+    server.snapshotter.wait()
+    dispatch(game, "a", {"type": "move", "dx": 2, "dy": 3})
+    dispatch(game, "a", {"type": "addmon", "x": 4, "y": 4, "name": "cow",
+                         "hello": "Moo", "hp": 3})
+    server.journal.close()
+    assert [start for start, _ in segments(journal)] == [2]
+
+    restored = Server(snapshot=snapshot, journal=journal)
+    assert sorted(restored.game.field) == [(1, 1), (4, 4)]
+    restored.game.add_player("a", NullOutbox())
+    assert restored.game.get_player("a").get_position() == (2, 3)
+    assert restored.journal.seq == 3
+    restored.journal.close()
+
+
+def test_malformed_command_does_not_break_recovery(tmp_path):
+    """Проверка того, что неполная команда не мешает перезапуску сервера."""
+    journal = str(tmp_path / "journal")
+    server = Server(journal=journal)
+    game = server.game
+    game.add_player("a", NullOutbox())
+    with pytest.raises(KeyError):
+        dispatch(game, "a", {"type": "move", "dx": 1})
+    dispatch(game, "a", {"type": "move", "dx": 1, "dy": 2})
+    server.journal.close()
+    assert [cmd for _, _, cmd in read_journal(journal, 0)] == [
+        {"type": "move", "dx": 1, "dy": 2}]
+
+    # Журналы, записанные до исправления, могли уже содержать такие записи.
+    bad = Journal(journal, 1)
+    bad.append("a", {"type": "attack", "name": "tux"})
+    bad.append("a", {"type": "move", "dx": 1, "dy": 0})
+    bad.close()
+    restored = Server(journal=journal)
+    restored.game.add_player("a", NullOutbox())
+    assert restored.game.get_player("a").get_position() == (2, 2)
+    assert restored.journal.seq == 3
+    restored.journal.close()
+
+
+def test_replay_after_rejoin(tmp_path):
+    """Проверка повтора журнала, когда игрок вышел и вошёл снова."""
+    journal = str(tmp_path / "journal")
+    server = Server(journal=journal)
+    game = server.game
+    enter(game, "a", NullOutbox())
+    dispatch(game, "a", {"type": "move", "dx": 5, "dy": 5})
+    leave(game, "a")
+    enter(game, "a", NullOutbox())
+    dispatch(game, "a", {"type": "addmon", "x": 1, "y": 0, "name": "tux",
+                         "hello": "Hi", "hp": 10})
+    dispatch(game, "a", {"type": "move", "dx": 1, "dy": 0})
+    dispatch(game, "a", {"type": "attack", "name": "tux", "damage": 10})
+    assert not game.field
+    server.journal.close()
+
+    restored = Server(journal=journal)
+    assert not restored.game.field
+    assert restored.game.saved_positions == {"a": (1, 0)}
+    restored.journal.close()
+
+
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_replay_repeats_monster_steps(tmp_path, vectorized):
+    """Проверка повтора перемещений монстров из журнала после снимка."""
+    if vectorized:
+        pytest.importorskip("numpy")
+    snapshot, journal = str(tmp_path / "world.snap"), str(tmp_path / "journal")
+    options = dict(width=8, height=8, vectorized=vectorized)
+    server = Server(snapshot=snapshot, journal=journal, **options)
+    game = server.game
+    for i in range(20):
+        cell = i * 5 % 64
+        game.add_monster(cell % 8, cell // 8, "tux", "Hi", i + 1)
+    for _ in range(3):
+        game.move_random_monster()
+    server.snapshotter.start()
+    server.snapshotter.wait()
+    for _ in range(5):
+        game.move_random_monster()
+    server.journal.close()
+
+    restored = Server(snapshot=snapshot, journal=journal, **options)
+    assert (sorted((pos, m.hitpoints) for pos, m in restored.game.field.items())
+            == sorted((pos, m.hitpoints) for pos, m in game.field.items()))
+    restored.journal.close()
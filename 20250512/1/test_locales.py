@@ -0,0 +1,50 @@
+import gettext
+import json
+import os
+import shutil
+
+from mood.server import locales
+from mood.server.server import Game, dispatch, welcome
+from mood.server.outbox import NullOutbox
+
+
+def test_catalog_matches_gettext():
+    """Проверка совпадения словарного каталога с gettext."""
+    reference = gettext.translation("messages", locales.LOCALE_DIR,
+                                    languages=["ru_RU"])
+    catalog = locales.translation("ru_RU")
+    assert isinstance(catalog, locales.Catalog)
+    assert Game().translation_for("ru_RU") is catalog
+    for key in reference._catalog:
+        if isinstance(key, tuple):
+            for n in (0, 1, 2, 5, 11, 21, 22, 111, 5000):
+                assert catalog.ngettext(key[0], "x", n) == \
+                    reference.ngettext(key[0], "x", n)
+        elif key:
+            assert catalog.gettext(key) == reference.gettext(key)
+    assert catalog.gettext("no such message") == "no such message"
+    assert locales.translation("xx_XX") is locales.NULL_TRANSLATIONS
+
+
+def test_locales_discovered_and_loaded_lazily(tmp_path, monkeypatch):
+    """Проверка обнаружения локалей и их загрузки при первом использовании."""
+    source = os.path.join(locales.LOCALE_DIR, "ru_RU")
+    for i in range(30):
+        shutil.copytree(source, tmp_path / f"l{i:02d}_XX")
+    monkeypatch.setattr(locales, "LOCALE_DIR", str(tmp_path))
+    monkeypatch.setattr(locales, "_available", None)
+    monkeypatch.setattr(locales, "_catalogs", {})
+    game = Game()
+    game.add_player("a", NullOutbox())
+    assert "l07_XX" not in locales._catalogs
+    res = dispatch(game, "a", {"type": "locale", "locale": "l07_XX"})
+    assert res["type"] == "locale_result"
+    assert len(locales.available_locales()) == 31
+    loaded = [name for name, catalog in locales._catalogs.items()
+              if catalog is not locales.NULL_TRANSLATIONS]
+    assert loaded == ["l07_XX"]
+    offered = json.loads(welcome(game, "a"))["locales"]
+    assert offered == sorted(locales.available_locales())
+    assert "en_US" in offered and "l29_XX" in offered
+    res = dispatch(game, "a", {"type": "locale", "locale": "ru_RU"})
+    assert res["type"] == "error"
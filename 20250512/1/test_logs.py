@@ -0,0 +1,41 @@
+import io
+import logging
+
+import pytest
+from mood.server.logs import parse_sample, setup_logging
+from mood.server.outbox import NullOutbox
+from mood.server.server import Game, dispatch
+
+
+@pytest.fixture
+def server_logger():
+    """Восстанавливает настройки журнала mood.server после теста."""
+    logger = logging.getLogger("mood.server")
+    saved = logger.handlers[:], logger.level, logger.propagate
+    yield logger
+    logger.handlers[:], logger.level, logger.propagate = saved
+
+
+def test_sampled_logging_through_writer_thread(server_logger):
+    """Проверка уровней и выборки записей журнала, пишущихся фоновым потоком."""
+    stream = io.StringIO()
+    listener = setup_logging("DEBUG", parse_sample("translations=0.25"), stream)
+    try:
+        game = Game()
+        game.add_player("a", NullOutbox())
+        for _ in range(10):
+            game.get_translation("a")
+        logging.getLogger("mood.server.translations").warning("kept")
+        dispatch(game, "a", {"type": "locale", "locale": "ru_RU"})
+    finally:
+        listener.stop()
+    lines = stream.getvalue().splitlines()
+    assert sum("Getting translation" in line for line in lines) == 3
+    assert any("WARNING mood.server.translations: kept" in line for line in lines)
+    assert any("Set locale for a to ru_RU" in line for line in lines)
+
+    stream.truncate(0)
+    listener = setup_logging("INFO", {}, stream)
+    game.get_translation("a")
+    listener.stop()
+    assert stream.getvalue() == ""
@@ -0,0 +1,99 @@
+import threading
+import urllib.request
+
+from mood.server.actor import InlineActor
+from mood.server.metrics import (DEEPEST_QUEUES, Histogram, MetricsServer,
+                                 render_prometheus)
+from mood.server.outbox import NullOutbox
+from mood.server.server import Game, StripedGame, dispatch
+
+
+def test_histogram_quantiles():
+    """Проверка корзин и квантилей гистограммы."""
+    h = Histogram((0.001, 0.01, 0.1))
+    for value in (0.0005, 0.0005, 0.005, 0.05, 5.0):
+        h.observe(value)
+    assert h.counts == [2, 1, 1, 1] and h.count == 5
+    assert h.quantile(0.4) == 0.001
+    assert h.quantile(0.6) == 0.01
+    assert h.quantile(1.0) == float("inf")
+
+
+def test_stats_denied_without_admins():
+    """Проверка того, что без --admin команда stats недоступна никому."""
+    game = Game()
+    game.add_player("a", NullOutbox())
+    res = dispatch(game, "a", {"type": "stats"})
+    assert res == {"type": "error", "message": "Permission denied"}
+
+
+def test_stats_command_and_prometheus_endpoint():
+    """Проверка команды stats и HTTP-эндпоинта метрик."""
+    game = Game()
+    game.add_player("a", NullOutbox())
+    game.add_player("b", NullOutbox())
+    game.admins = frozenset({"a"})
+    dispatch(game, "a", {"type": "sayall", "message": "hi"})
+    dispatch(game, "a", {"type": "move", "dx": 1, "dy": 0})
+    dispatch(game, "a", {"type": "nonsense"})
+    assert dispatch(game, "b", {"type": "stats"})["type"] == "error"
+    res = dispatch(game, "a", {"type": "stats"})
+    assert res["type"] == "stats_result"
+    assert res["stats"]["players"] == 2
+    assert res["stats"]["commands"]["sayall"]["count"] == 1
+    assert res["stats"]["fanout"]["recipients"] >= 2
+
+    server = MetricsServer(InlineActor(game), port=0)
+    server.start_thread()
+    try:
+        with urllib.request.urlopen(
+                f"http://localhost:{server.port}/metrics") as response:
+            text = response.read().decode()
+    finally:
+        server.stop()
+    assert 'mood_command_seconds_count{command="move"} 1' in text
+    assert 'mood_command_seconds_count{command="unknown"} 1' in text
+    assert 'mood_command_seconds_bucket{command="sayall",le="+Inf"} 1' in text
+    assert "mood_players 2" in text
+
+
+def test_stats_report_deepest_queues(recording_outbox):
+    """Проверка самых длинных очередей в stats и очереди каждого игрока в /metrics."""
+    game = Game()
+    outboxes = [recording_outbox() for _ in range(DEEPEST_QUEUES + 5)]
+    for i, outbox in enumerate(outboxes):
+        game.add_player(f"p{i}", outbox)
+        outbox._take_all()
+        for _ in range(i):
+            outbox.send(b"x\n")
+    game.add_player('"admin"', recording_outbox())
+    game.admins = frozenset({'"admin"'})
+    stats = dispatch(game, '"admin"', {"type": "stats"})["stats"]
+    deepest = stats["deepest_queues"]
+    assert list(deepest) == [f"p{i}" for i in range(14, 4, -1)]
+    assert deepest["p14"] == stats["max_queue_depth"] == 14
+    assert stats["queued_frames"] == sum(range(len(outboxes)))
+
+    text = render_prometheus(game)
+    assert 'mood_queue_depth{player="p0"} 0' in text
+    assert 'mood_queue_depth{player="p14"} 14' in text
+    assert 'mood_queue_depth{player="\\"admin\\""} 0' in text
+
+
+def test_striped_game_metrics_count_every_command():
+    """Проверка подсчёта всех команд при параллельной работе StripedGame."""
+    game = StripedGame(width=100, height=100)
+    for i in range(8):
+        game.add_player(f"p{i}", NullOutbox())
+
+    def play(user):
+        for _ in range(500):
+            dispatch(game, user, {"type": "move", "dx": 1, "dy": 0})
+
+    threads = [threading.Thread(target=play, args=(f"p{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert game.metrics.commands["move"].count == 8 * 500
+    assert sum(game.metrics.commands["move"].counts) == 8 * 500
@@ -0,0 +1,41 @@
+def test_drop_low_priority_on_overflow(recording_outbox):
+    """Проверка отбрасывания низкоприоритетных сообщений при переполнении."""
+    outbox = recording_outbox(maxsize=2, policy="drop")
+    assert outbox.send(b"a\n", key=("moved", "x"))
+    assert outbox.send(b"b\n")
+    assert not outbox.send(b"c\n", key=("moved", "y"))
+    assert outbox.send(b"d\n")
+    assert outbox._take_all() == b"b\nd\n"
+    assert outbox.dropped == 2
+    assert not outbox.closed
+
+
+def test_coalesce_on_overflow(recording_outbox):
+    """Проверка замены устаревшего сообщения с тем же ключом."""
+    outbox = recording_outbox(maxsize=2, policy="coalesce")
+    outbox.send(b"x at 1\n", key=("moved", "x"))
+    outbox.send(b"chat\n")
+    assert outbox.send(b"x at 2\n", key=("moved", "x"))
+    assert outbox.queue_depth == 2
+    assert outbox._take_all() == b"x at 2\nchat\n"
+
+
+def test_disconnect_on_overflow(recording_outbox):
+    """Проверка отключения медленного клиента."""
+    outbox = recording_outbox(maxsize=1, policy="disconnect")
+    outbox.send(b"a\n")
+    assert not outbox.send(b"b\n")
+    assert outbox.closed
+
+
+def test_batched_until_flush(recording_outbox):
+    """Проверка отправки накопленных за тик сообщений одной записью."""
+    wakeups = []
+    outbox = recording_outbox(autoflush=False)
+    outbox._wakeup = lambda: wakeups.append(outbox._take_all())
+    outbox.send(b"a\n")
+    outbox.send(b"b\n", key=("moved", "x"))
+    assert wakeups == []
+    outbox.flush()
+    outbox.flush()
+    assert wakeups == [b"a\nb\n"]
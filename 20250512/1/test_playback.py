@@ -0,0 +1,61 @@
+import pytest
+
+from mood.common.framing import encode_frame
+from mood.server.playback import TranscriptOutbox, play
+from mood.server.server import Server, dispatch, enter, leave
+
+
+def test_playback_matches_recorded_session(tmp_path):
+    """Проверка побайтового совпадения воспроизведения с записанным сеансом."""
+    path = str(tmp_path / "session.rec")
+    server = Server(record=path, seed=7)
+    game = server.game
+    live = []
+    outboxes = {user: TranscriptOutbox(user, live) for user in ("a", "b")}
+    commands = [
+        ("a", {"type": "addmon", "x": 1, "y": 1, "name": "cow",
+               "hello": "Moo", "hp": 10}),
+        ("a", {"type": "addmon", "x": 0, "y": 1, "name": "tux",
+               "hello": "Hi", "hp": 5}),
+        ("b", {"type": "move", "dx": 1, "dy": 1}),
+        ("a", {"type": "move", "dx": 0, "dy": 1}),
+        ("a", {"type": "attack", "name": "tux", "damage": 3}),
+        ("b", {"type": "locale", "locale": "ru_RU"}),
+        ("b", {"type": "sayall", "message": "hello"}),
+        ("a", {"type": "timer"}),
+    ]
+    enter(game, "a", outboxes["a"])
+    enter(game, "b", outboxes["b"])
+    for user, cmd in commands:
+        outboxes[user].send(encode_frame(dispatch(game, user, cmd)))
+        game.move_random_monster()
+    leave(game, "b")
+    server.recorder.close()
+
+    first, second = play(path), play(path)
+    assert first.events == 2 + 2 * len(commands) + 1
+    assert first.transcript == live
+    assert first.digest == second.digest
+
+
+def test_playback_goes_on_after_failed_command(tmp_path):
+    """Проверка воспроизведения сеанса, в котором команда упала с ошибкой."""
+    path = str(tmp_path / "incident.rec")
+    server = Server(record=path, seed=3)
+    game = server.game
+    enter(game, "a", TranscriptOutbox("a", []))
+    enter(game, "b", TranscriptOutbox("b", []))
+    dispatch(game, "a", {"type": "addmon", "x": 1, "y": 1, "name": "tux",
+                         "hello": "Hi", "hp": 5})
+    # Как в обработчике соединения: ошибка команды отключает игрока.
+    with pytest.raises(KeyError):
+        dispatch(game, "a", {"type": "attack", "name": "tux"})
+    leave(game, "a")
+    dispatch(game, "b", {"type": "sayall", "message": "still here"})
+    server.recorder.close()
+
+    result = play(path)
+    assert result.errors == [(4, "a", "KeyError('damage')")]
+    assert result.events == 6
+    assert any(b"still here" in frame for user, frame in result.transcript
+               if user == "b")
@@ -0,0 +1,72 @@
+import pytest
+
+from mood.server.outbox import NullOutbox
+from mood.server.ratelimit import RateLimiter, TokenBucket, parse_limits
+from mood.server.server import Game, throttle
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_limits():
+    """Проверка разбора лимитов из командной строки."""
+    assert parse_limits("default=20/40, sayall=1") == {
+        "default": (20.0, 40.0), "sayall": (1.0, 1.0)}
+    with pytest.raises(ValueError):
+        parse_limits("move=0/5")
+    with pytest.raises(ValueError):
+        parse_limits("move")
+
+
+def test_token_bucket_burst_and_refill():
+    """Проверка всплеска и пополнения корзины токенов."""
+    bucket = TokenBucket(2.0, 3.0, 0.0)
+    assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.25) == pytest.approx(0.25)
+    assert bucket.take(0.5) == 0.0
+    assert bucket.take(100.0) == 0.0 and bucket.tokens == 2.0
+
+
+def test_reserve_spaces_out_deferred_commands():
+    """Проверка того, что отложенные команды идут с шагом в 1/rate."""
+    clock = FakeClock()
+    limiter = RateLimiter({"default": (10.0, 1.0)}, clock)
+    waits = [limiter.check("move", reserve=True) for _ in range(4)]
+    assert waits == pytest.approx([0.0, 0.1, 0.2, 0.3])
+    assert limiter.limited == 3
+
+
+def test_limits_by_command_type():
+    """Проверка отдельных корзин по типам команд и общей корзины default."""
+    clock = FakeClock()
+    limiter = RateLimiter({"default": (1.0, 2.0), "sayall": (1.0, 1.0)}, clock)
+    assert limiter.check("sayall") == 0.0
+    assert limiter.check("sayall") > 0
+    assert limiter.check("move") == limiter.check("junk") == 0.0
+    assert limiter.check(["not", "a", "type"]) > 0
+    assert RateLimiter({"sayall": (1.0, 1.0)}, clock).check("move") == 0.0
+
+
+def test_throttle_policies():
+    """Проверка политик defer и reject для команд сверх лимита."""
+    game = Game()
+    game.add_player("a", NullOutbox())
+    game.rate_limits = {"default": (1.0, 1.0)}
+    limiter = RateLimiter(game.rate_limits)
+    assert throttle(game, "a", {"type": "move"}, limiter) == (0.0, None)
+    wait, res = throttle(game, "a", {"type": "move"}, limiter)
+    assert wait > 0 and res is None
+
+    game.rate_policy = "reject"
+    limiter = RateLimiter(game.rate_limits)
+    throttle(game, "a", {"type": "move"}, limiter)
+    wait, res = throttle(game, "a", {"type": "move"}, limiter)
+    assert wait == 0.0 and res["type"] == "error"
+    assert res["message"].startswith("Too many commands")
+    assert game.metrics.throttled == 2
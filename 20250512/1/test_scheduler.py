@@ -0,0 +1,36 @@
+import asyncio
+import time
+from mood.server.scheduler import Scheduler
+
+
+def test_timers_fire_at_tick_resolution():
+    """Проверка разовых и повторяющихся таймеров."""
+    scheduler = Scheduler(tick=1.0)
+    calls = []
+    scheduler.call_later(2.5, calls.append, "once")
+    timer = scheduler.call_every(2.0, calls.append, "every")
+    for now in range(1, 8):
+        scheduler.run_tick(float(now))
+    assert calls == ["every", "once", "every", "every"]
+    timer.cancel()
+    scheduler.run_tick(8.0)
+    assert calls == ["every", "once", "every", "every"]
+
+
+def test_tick_callbacks_and_overruns():
+    """Проверка вызова подписчиков на каждом тике и подсчёта перегрузок."""
+    scheduler = Scheduler(tick=0.01)
+    ticks = []
+
+    def on_tick():
+        ticks.append(1)
+        if len(ticks) == 3:
+            time.sleep(0.05)
+        if len(ticks) == 6:
+            scheduler.stop()
+
+    scheduler.on_tick(on_tick)
+    asyncio.run(asyncio.wait_for(scheduler.run(), 2))
+    assert scheduler.ticks == 6
+    assert scheduler.overruns == 1
+    assert scheduler.skipped >= 4
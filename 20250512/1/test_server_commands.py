@@ -3,7 +3,10 @@ import socket
 import json
 import time
 import multiprocessing
-from mood.server.server import Server
+import weakref
+from mood.common.framing import FrameDecoder, recv_frame
+from mood.server.events import Event, render
+from mood.server.server import Game, Server
 
 
 def run_server(port):
@@ -52,26 +55,49 @@ def server():
         proc.kill()
 
 
+DECODERS = weakref.WeakKeyDictionary()
+
+
 def receive_response(sock, expected_type=None, timeout=10):
     """Получение ответа от сервера с фильтрацией по типу."""
-    start_time = time.time()
-    data = b""
-    while time.time() - start_time < timeout:
-        chunk = sock.recv(1024)
-        if not chunk:
-            break
-        data += chunk
+    decoder = DECODERS.setdefault(sock, FrameDecoder())
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        sock.settimeout(max(deadline - time.time(), 0.01))
         try:
-            response = json.loads(data.decode())
-            data = b""  # Сбрасываем буфер
-            if expected_type and response["type"] != expected_type:
-                continue  # Пропускаем неподходящие сообщения
-            return response
-        except json.JSONDecodeError:
-            continue
+            response = recv_frame(sock, decoder)
+        except (ConnectionError, socket.timeout):
+            break
+        if expected_type and response["type"] != expected_type:
+            continue  # Пропускаем неподходящие сообщения
+        return response
     return None
 
 
+def test_pipelined_commands_echo_ids(server):
+    """Проверка сопоставления ответов на конвейерные команды по id."""
+    sock, username, port = server
+    commands = [
+        {"type": "addmon", "x": 1, "y": 1, "name": "tux", "hello": "Moo!",
+         "hp": 50, "id": "a"},
+        {"type": "timer", "id": 7},
+        {"type": "attack", "name": "tux", "damage": 10, "id": "c"},
+        {"type": "sayall", "message": "hi"},
+    ]
+    sock.send(b"".join(json.dumps(c).encode() + b"\n" for c in commands))
+    decoder = DECODERS.setdefault(sock, FrameDecoder())
+    sock.settimeout(10)
+    by_id, untagged = {}, []
+    while len(by_id) < 3 or not untagged:
+        response = recv_frame(sock, decoder)
+        if "id" in response:
+            by_id[response["id"]] = response["type"]
+        elif response["type"] == "sayall_result":
+            untagged.append(response)
+    assert by_id == {"a": "added_monster", 7: "timer_result",
+                     "c": "attack_result"}
+
+
 def test_add_monster(server):
     """Проверка команды установки монстра."""
     sock, username, port = server
@@ -150,4 +176,45 @@ def test_attack_monster(server):
     assert response is not None, "No attack_result response received"
     assert response["type"] == "attack_result"
     assert "Attacked tux, damage 10 hp" in response["message"]
-    assert "tux now has 40 hp" in response["message"]
\ No newline at end of file
+    assert "tux now has 40 hp" in response["message"]
+
+
+def test_broadcast_localized(server):
+    """Проверка рассылки события игрокам с разными локалями."""
+    sock, username, port = server
+    other = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    other.connect(('localhost', port))
+    other.send(json.dumps({"username": "other_user"}).encode() + b"\n")
+    receive_response(other, expected_type="welcome")
+    other.send(json.dumps({"type": "locale", "locale": "ru_RU"}).encode() + b"\n")
+    receive_response(other, expected_type="locale_result")
+
+    command = {
+        "type": "addmon",
+        "x": 2,
+        "y": 3,
+        "name": "tux",
+        "hello": "Moo!",
+        "hp": 50
+    }
+    sock.send(json.dumps(command).encode() + b"\n")
+    response = receive_response(other, expected_type="broadcast")
+    while response and response.get("event") != "added":
+        response = receive_response(other, expected_type="broadcast")
+    other.close()
+    assert response is not None, "No added broadcast received"
+    assert response["message"] == "test_user добавил tux на (2,3) с сообщением Moo!"
+
+
+def test_attack_broadcast_with_one_hp_left():
+    """Проверка рассылки об атаке, после которой у монстра остался 1 hp."""
+    game = Game()
+    en, ru = game.translation_for("en_US"), game.translation_for("ru_RU")
+    assert render(Event("attacked", ("a", "tux", "sword", 3, 1)), en) == \
+        "a attacked tux with sword, dealing 3 damage. tux has 1 HP remaining."
+    assert render(Event("attacked", ("a", "tux", "sword", 3, 21)), ru).endswith(
+        "У tux осталось 21 очко здоровья.")
+    assert render(Event("attacked", ("a", "tux", "sword", 3, 5)), ru).endswith(
+        "У tux осталось 5 очков здоровья.")
+    assert render(Event("attacked", ("a", "tux", "sword", 3, 0)), ru).endswith(
+        "tux убит!")
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from mood.common.models import Monster
+from mood.server.outbox import NullOutbox
+from mood.server.server import Game
+
+np = pytest.importorskip("numpy")
+from mood.server import simulation  # noqa: E402
+from mood.server.aoi import InterestGrid  # noqa: E402
+from mood.server.simulation import Moves, MonsterSwarm, visible_moves  # noqa: E402
+
+
+def test_swarm_mapping():
+    """Проверка добавления, поиска и удаления монстров в массивах."""
+    swarm = MonsterSwarm(10, 10)
+    swarm[(1, 2)] = Monster(1, 2, "tux", "Hi", 10)
+    swarm[(3, 4)] = Monster(3, 4, "cow", "Moo", 5)
+    assert swarm[(3, 4)].name == "cow"
+    swarm[(3, 4)].hitpoints -= 2
+    assert swarm[(3, 4)].hitpoints == 3
+    del swarm[(1, 2)]
+    assert list(swarm) == [(3, 4)]
+    assert swarm.get((1, 2)) is None
+    assert swarm[(3, 4)].hello == "Moo"
+
+
+@pytest.mark.parametrize("dense_limit", [simulation.DENSE_LIMIT, 0],
+                         ids=["dense", "sparse"])
+def test_swarm_step_keeps_cells_unique(monkeypatch, dense_limit):
+    """Проверка, что после шага в каждой клетке не больше одного монстра."""
+    monkeypatch.setattr(simulation, "DENSE_LIMIT", dense_limit)
+    swarm = MonsterSwarm(8, 8, seed=1)
+    for x in range(8):
+        for y in range(0, 8, 2):
+            swarm[(x, y)] = Monster(x, y, "tux", "Hi", 10)
+    for step in range(20):
+        moves = swarm.step()
+        assert len(set(swarm)) == len(swarm) == 32
+        for index, x, y in zip(moves.indices, moves.xs, moves.ys):
+            assert swarm[(int(x), int(y))].get_position() == (x, y)
+            assert swarm.xs[index] == x
+        # Изменения между шагами: удаление и добавление монстра.
+        pos = next(iter(swarm))
+        del swarm[pos]
+        assert pos not in swarm
+        swarm[pos] = Monster(*pos, "cow", "Moo", step)
+        assert swarm[pos].hitpoints == step
+        assert all(swarm[p].get_position() == p for p in swarm)
+
+
+def test_visible_moves_in_large_world():
+    """Проверка отбора видимых перемещений в мире 1M x 1M."""
+    interest = InterestGrid(radius=10, width=10**6, height=10**6)
+    interest.add("alice", (900000, 900000))
+    moves = Moves(np.array([0, 1]), np.array([3, 3]),
+                  np.array([900000, 10], np.int32),
+                  np.array([900001, 10], np.int32))
+    assert visible_moves(moves, interest).indices.tolist() == [0]
+
+
+def test_vectorized_game_batches_moves(recording_outbox):
+    """Проверка пакетной рассылки перемещений монстров в радиусе видимости."""
+    game = Game(view_radius=2, width=100, height=100, vectorized=True)
+    near, far = recording_outbox(), recording_outbox()
+    game.add_player("near", near)
+    game.add_player("far", far)
+    game.get_player("far").move(50, 50)
+    game.add_monster(1, 0, "tux", "Hi", 10)
+    game.add_monster(30, 30, "cow", "Moo", 10)
+    game.move_random_monster()
+    frames = [json.loads(line) for line in near._take_all().splitlines()]
+    frames = [f for f in frames if f["type"] == "broadcast"]
+    assert [f["event"] for f in frames] == ["monsters_moved"]
+    assert frames[0]["message"].startswith("Monster tux moved one cell ")
+    assert far._take_all() == b""
+
+
+def test_killing_a_swarm_monster_reports_zero_hp():
+    """Проверка результата атаки, убившей монстра в векторном поле."""
+    game = Game(vectorized=True)
+    game.add_player("a", NullOutbox())
+    game.add_monster(0, 0, "tux", "Hi", 3)
+    game.add_monster(5, 5, "cow", "Moo", 10)
+    assert game.attack_monster("a", "tux", "sword", 5) == (True, 3, 0, True)
+    assert game.field[5, 5].hitpoints == 10
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+from mood.server.server import Game
+from mood.server.snapshot import Snapshotter, capture, restore, write_snapshot
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Проверка сохранения и восстановления монстров и позиций игроков."""
+    path = str(tmp_path / "world.snap")
+    game = Game(width=100, height=50)
+    game.add_monster(99, 49, "tux", "Привет", 7)
+    game.add_monster(3, 4, "cow", "Moo", 10)
+    game.add_player("alice", None)
+    game.get_player("alice").move(5, 6)
+    write_snapshot(path, capture(game))
+    assert not os.path.exists(path + ".tmp")
+
+    restored = Game(width=100, height=50)
+    assert restore(restored, path) == 2
+    monster = restored.field[(99, 49)]
+    assert (monster.name, monster.hello, monster.hitpoints) == ("tux", "Привет", 7)
+    assert restored.field[(3, 4)].name == "cow"
+    restored.add_player("alice", None)
+    assert restored.get_player("alice").get_position() == (5, 6)
+    with pytest.raises(ValueError):
+        restore(Game(width=10, height=10), path)
+
+
+def test_snapshotter_writes_in_background(tmp_path):
+    """Проверка фоновой записи снимка и восстановления в векторное поле."""
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "world.snap")
+    game = Game(width=20, height=20)
+    for x in range(20):
+        game.add_monster(x, 2 * x % 20, f"m{x}", "Hi", x + 1)
+    snapshotter = Snapshotter(game, path)
+    assert snapshotter.start()
+    snapshotter.wait()
+    assert (snapshotter.written, snapshotter.failed) == (1, 0)
+
+    restored = Game(width=20, height=20, vectorized=True)
+    assert restore(restored, path) == 20
+    assert sorted(restored.field) == sorted(game.field)
+    assert restored.field[(7, 14)].hitpoints == 8
+
+    again = Game(width=20, height=20)
+    snapshotter = Snapshotter(restored, path)
+    assert snapshotter.start()
+    snapshotter.wait()
+    assert restore(again, path) == 20
+    assert again.field[(7, 14)].name == "m7"
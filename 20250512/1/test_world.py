@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+from mood.common.models import Monster
+from mood.server.aoi import InterestGrid
+from mood.server.server import Game, Server, StripedGame
+from mood.server.world import World
+
+
+def test_interest_near():
+    """Проверка выбора игроков в радиусе видимости."""
+    grid = InterestGrid(radius=2, width=100, height=100)
+    grid.add("near", (11, 10))
+    grid.add("edge", (12, 8))
+    grid.add("far", (13, 10))
+    assert sorted(grid.near((10, 10))) == ["edge", "near"]
+
+
+def test_interest_wraps_around():
+    """Проверка видимости через край закольцованного поля."""
+    grid = InterestGrid(radius=3, width=10, height=10)
+    grid.add("a", (9, 9))
+    grid.add("b", (5, 5))
+    assert list(grid.near((1, 0))) == ["a"]
+
+
+def test_interest_move_and_remove():
+    """Проверка перемещения и удаления игрока из индекса."""
+    grid = InterestGrid(radius=2, width=100, height=100)
+    grid.add("a", (0, 0))
+    grid.move("a", (50, 50))
+    assert list(grid.near((0, 0))) == []
+    assert list(grid.near((51, 49))) == ["a"]
+    grid.remove("a")
+    assert list(grid.near((51, 49))) == []
+
+
+def test_world_allocates_chunks_on_demand():
+    """Проверка выделения фрагментов поля только под занятые клетки."""
+    world = World(1_000_000, 1_000_000)
+    assert world.chunk_count == 0
+    world[(999_999, 5)] = Monster(999_999, 5, "tux", "Hi", 10)
+    world[(999_998, 6)] = Monster(999_998, 6, "tux", "Hi", 10)
+    assert len(world) == 2 and world.chunk_count == 1
+    assert (999_999, 5) in world and world.get((0, 0)) is None
+    del world[(999_999, 5)]
+    world.pop((999_998, 6))
+    assert len(world) == 0 and world.chunk_count == 0
+    assert world.wrap(1_000_000, -1) == (0, 999_999)
+
+
+def test_world_size_limit():
+    """Проверка ограничения размеров мира."""
+    with pytest.raises(ValueError):
+        World(1_000_001, 10)
+
+
+def test_game_cell_index():
+    """Проверка обратного индекса клеток при входе, ходе и выходе игрока."""
+    game = Game()
+    game.add_player("a", None)
+    game.add_player("b", None)
+    assert game.players_at((0, 0)) == {"a", "b"}
+    game.get_player("a").move(1, 2)
+    assert game.players_at((0, 0)) == {"b"}
+    assert game.players_at((1, 2)) == {"a"}
+    game.remove_player("a")
+    assert game.players_at((1, 2)) == set()
+
+
+def test_roster_is_copy_on_write():
+    """Проверка неизменности снимка списка игроков при входе и выходе."""
+    game = Game()
+    game.add_player("a", None)
+    game.add_player("b", None)
+    roster, players = game.roster, game.players
+    game.remove_player("a")
+    game.add_player("c", None)
+    game.set_locale("b", "ru_RU")
+    assert [name for name, _ in roster] == ["a", "b"]
+    assert sorted(players) == ["a", "b"]
+    assert [(name, entry[2]) for name, entry in game.roster] == [
+        ("b", "ru_RU"), ("c", "en_US")]
+
+
+def test_striped_game_parallel_monster_moves():
+    """Проверка целостности поля при параллельных перемещениях монстров."""
+    game = StripedGame(width=20, height=20)
+    for x in range(20):
+        game.add_monster(x, x, "tux", "Hi", 10)
+
+    def mover():
+        for _ in range(200):
+            game.move_random_monster()
+
+    threads = [threading.Thread(target=mover) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(game.field) == len(list(game.field)) == 20
+    assert all(game.field[pos].get_position() == pos for pos in game.field)
+
+
+def test_striped_game_requires_threads_engine():
+    """Проверка, что StripedGame работает только с движком threads."""
+    with pytest.raises(ValueError):
+        Server(striped=True)
+    assert isinstance(Server(engine="threads", striped=True).game, StripedGame)